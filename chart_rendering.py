@@ -0,0 +1,169 @@
+import io
+import os
+import json
+import base64
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+RENDER_VERSION = 1
+DPI = 100
+
+def _render_class_performance(figure, data):
+    class_names = [row[0] for row in data]
+    avg_grades = [row[1] for row in data]
+
+    ax = figure.add_subplot()
+    bars = ax.bar(class_names, avg_grades, color='skyblue')
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                f'{height:.1f}%', ha='center', va='bottom')
+
+    ax.set_title('Average Grade by Class', fontsize=14)
+    ax.set_xlabel('Class', fontsize=12)
+    ax.set_ylabel('Average Grade (%)', fontsize=12)
+    ax.set_ylim(0, 100)
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+
+def _render_grade_distribution(figure, data):
+    labels = [row[0] for row in data]
+    values = [row[1] for row in data]
+    colors = ['#4CAF50', '#8BC34A', '#FFC107', '#FF9800', '#F44336']
+
+    figure.patch.set_facecolor('#F0F0F0')
+    ax = figure.add_subplot()
+
+    wedges, texts, autotexts = ax.pie(
+        values,
+        labels=None,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=colors,
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1},
+        textprops={'fontsize': 12, 'color': 'white'}
+    )
+
+    ax.axis('equal')
+    ax.set_title('Grade Distribution', fontsize=16, pad=20)
+
+    ax.legend(
+        wedges,
+        labels,
+        title="Grade Ranges",
+        loc="center left",
+        bbox_to_anchor=(1, 0, 0.5, 1)
+    )
+
+def _render_grade_trends(figure, data):
+    periods = sorted({period for _, points in data for period, _ in points})
+    positions = {period: index for index, period in enumerate(periods)}
+
+    ax = figure.add_subplot()
+    for label, points in data:
+        ax.plot([positions[period] for period, _ in points], [grade for _, grade in points],
+                marker='o', linewidth=2, label=label)
+
+    ax.set_xticks(range(len(periods)))
+    ax.set_xticklabels(periods, rotation=45, ha='right')
+    ax.set_title('Average Grade Over Time', fontsize=14)
+    ax.set_xlabel('Period Starting', fontsize=12)
+    ax.set_ylabel('Average Grade (%)', fontsize=12)
+    ax.set_ylim(0, 100)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    figure.tight_layout()
+
+RENDERERS = {
+    'class_performance': _render_class_performance,
+    'grade_distribution': _render_grade_distribution,
+    'grade_trends': _render_grade_trends,
+}
+
+def render_png(kind, data, size):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    width, height = size
+    figure = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+    FigureCanvasAgg(figure)
+    RENDERERS[kind](figure, data)
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def render_to_cache(kind, data, size, path):
+    png = render_png(kind, data, size)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(png)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not cache chart {kind}: {str(e)}")
+    return png
+
+def png_to_photo_data(png):
+    return base64.b64encode(png).decode('ascii')
+
+def default_cache_dir():
+    # Per-user cache location, so other accounts cannot plant or read chart images
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'school_management', 'charts')
+
+class ChartRenderer:
+    def __init__(self, cache_dir=None, max_workers=1, max_cache_entries=64):
+        self.cache_dir = cache_dir or os.environ.get('SCHOOL_CHART_CACHE') or default_cache_dir()
+        self.max_workers = max_workers
+        self.max_cache_entries = max_cache_entries
+        self._executor = None
+
+    def cache_key(self, kind, data, size):
+        payload = json.dumps([RENDER_VERSION, kind, data, list(size)], separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def cache_path(self, kind, data, size):
+        return os.path.join(self.cache_dir, f"{kind}-{self.cache_key(kind, data, size)}.png")
+
+    def load_cached(self, kind, data, size):
+        path = self.cache_path(kind, data, size)
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+        except OSError:
+            return None
+        try:
+            # Pruning evicts the oldest mtime first, so a hit refreshes it to keep charts in use around
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def render(self, kind, data, size):
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        self._prune_cache()
+        if self._executor is None:
+            # Forking a process that already runs Tk and the database worker threads can deadlock the child
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor.submit(render_to_cache, kind, data, tuple(size), self.cache_path(kind, data, size))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _prune_cache(self):
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                       if name.endswith('.png')]
+            if len(entries) < self.max_cache_entries:
+                return
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:len(entries) - self.max_cache_entries + 1]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Could not prune chart cache: {str(e)}")
@@ -0,0 +1,101 @@
+import time
+
+class LoadJob:
+    def __init__(self, steps, total, on_done):
+        self.steps = steps
+        self.total = total
+        self.on_done = on_done
+        self.done = 0
+
+class ChunkedLoader:
+    def __init__(self, root, budget_ms=15, interval=1):
+        self.root = root
+        self.budget = budget_ms / 1000
+        self.interval = interval
+
+        self._jobs = {}
+        self._after_job = None
+        self._progress_listeners = []
+
+        self._slices = 0
+        self._finished = 0
+        self._cancelled = 0
+
+    @property
+    def active(self):
+        return len(self._jobs)
+
+    def add_progress_listener(self, callback):
+        self._progress_listeners.append(callback)
+
+    def start(self, key, steps, total, on_done=None):
+        self.cancel(key)
+        self._jobs[key] = LoadJob(steps, total, on_done)
+        # The first slice runs straight away so the newest rows show up without waiting for the event loop
+        self._run_slice()
+
+    def cancel(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.steps.close()
+            self._cancelled += 1
+            self._notify()
+
+    def cancel_all(self):
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._after_job:
+            self.root.after_cancel(self._after_job)
+            self._after_job = None
+
+    def stats(self):
+        return {
+            'active': len(self._jobs),
+            'slices': self._slices,
+            'finished': self._finished,
+            'cancelled': self._cancelled,
+        }
+
+    def _tick(self):
+        self._after_job = None
+        self._run_slice()
+
+    def _run_slice(self):
+        self._slices += 1
+        deadline = time.perf_counter() + self.budget
+        for key, job in list(self._jobs.items()):
+            finished = False
+            try:
+                if not job.done:
+                    # The first step also plans the whole refresh, so that time is not charged to the slice
+                    job.done = next(job.steps)
+                    deadline = time.perf_counter() + self.budget
+                while time.perf_counter() < deadline:
+                    job.done = next(job.steps)
+            except StopIteration:
+                finished = True
+            except Exception as e:
+                print(f"Error loading rows: {str(e)}")
+                finished = True
+
+            if finished:
+                self._jobs.pop(key, None)
+                self._finished += 1
+                if job.on_done:
+                    job.on_done()
+            if time.perf_counter() >= deadline:
+                break
+
+        self._notify()
+        if self._jobs and self._after_job is None:
+            # Yield to the event loop between slices so typing and scrolling stay responsive
+            self._after_job = self.root.after(self.interval, self._tick)
+
+    def _notify(self):
+        done = sum(job.done for job in self._jobs.values())
+        total = sum(job.total for job in self._jobs.values())
+        for callback in self._progress_listeners:
+            callback(done, total)
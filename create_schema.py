@@ -0,0 +1,314 @@
+import argparse
+
+SQLSERVER_TABLES = [
+    ('Students', """
+        CREATE TABLE Students (
+            StudentID INT IDENTITY(1,1) PRIMARY KEY,
+            FullName NVARCHAR(100) NOT NULL,
+            DOB DATE NULL,
+            Gender CHAR(1) NULL,
+            Email NVARCHAR(100) NULL,
+            Phone NVARCHAR(20) NULL,
+            Address NVARCHAR(255) NULL
+        )
+    """),
+    ('Teachers', """
+        CREATE TABLE Teachers (
+            TeacherID INT IDENTITY(1,1) PRIMARY KEY,
+            FullName NVARCHAR(100) NOT NULL,
+            Department NVARCHAR(100) NULL,
+            Email NVARCHAR(100) NULL,
+            Phone NVARCHAR(20) NULL
+        )
+    """),
+    ('Classes', """
+        CREATE TABLE Classes (
+            ClassID INT IDENTITY(1,1) PRIMARY KEY,
+            ClassName NVARCHAR(100) NOT NULL,
+            TeacherID INT NULL REFERENCES Teachers(TeacherID) ON DELETE SET NULL
+        )
+    """),
+    ('Subjects', """
+        CREATE TABLE Subjects (
+            SubjectID INT IDENTITY(1,1) PRIMARY KEY,
+            SubjectName NVARCHAR(100) NOT NULL,
+            Description NVARCHAR(255) NULL
+        )
+    """),
+    ('ClassSubjects', """
+        CREATE TABLE ClassSubjects (
+            ClassID INT NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            SubjectID INT NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            PRIMARY KEY (ClassID, SubjectID)
+        )
+    """),
+    ('Enrollments', """
+        CREATE TABLE Enrollments (
+            StudentID INT NOT NULL REFERENCES Students(StudentID) ON DELETE CASCADE,
+            ClassID INT NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            EnrollmentDate DATETIME NOT NULL DEFAULT GETDATE(),
+            PRIMARY KEY (StudentID, ClassID)
+        )
+    """),
+    ('Grades', """
+        CREATE TABLE Grades (
+            GradeID INT IDENTITY(1,1) PRIMARY KEY,
+            StudentID INT NOT NULL REFERENCES Students(StudentID) ON DELETE CASCADE,
+            SubjectID INT NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            ClassID INT NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            Grade DECIMAL(5, 2) NOT NULL,
+            RecordedAt DATETIME2(0) NOT NULL CONSTRAINT DF_Grades_RecordedAt DEFAULT GETDATE()
+        )
+    """),
+    ('GradeAggregates', """
+        CREATE TABLE GradeAggregates (
+            ClassID INT NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            SubjectID INT NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            GradeSum DECIMAL(18, 2) NOT NULL DEFAULT 0,
+            GradeCount INT NOT NULL DEFAULT 0,
+            MinGrade DECIMAL(5, 2) NULL,
+            MaxGrade DECIMAL(5, 2) NULL,
+            BandA INT NOT NULL DEFAULT 0,
+            BandB INT NOT NULL DEFAULT 0,
+            BandC INT NOT NULL DEFAULT 0,
+            BandD INT NOT NULL DEFAULT 0,
+            BandF INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (ClassID, SubjectID)
+        )
+    """),
+]
+
+SQLITE_TABLES = [
+    ('Students', """
+        CREATE TABLE Students (
+            StudentID INTEGER PRIMARY KEY AUTOINCREMENT,
+            FullName NVARCHAR(100) NOT NULL COLLATE NOCASE,
+            DOB DATE,
+            Gender CHAR(1),
+            Email NVARCHAR(100),
+            Phone NVARCHAR(20),
+            Address NVARCHAR(255)
+        )
+    """),
+    ('Teachers', """
+        CREATE TABLE Teachers (
+            TeacherID INTEGER PRIMARY KEY AUTOINCREMENT,
+            FullName NVARCHAR(100) NOT NULL COLLATE NOCASE,
+            Department NVARCHAR(100),
+            Email NVARCHAR(100),
+            Phone NVARCHAR(20)
+        )
+    """),
+    ('Classes', """
+        CREATE TABLE Classes (
+            ClassID INTEGER PRIMARY KEY AUTOINCREMENT,
+            ClassName NVARCHAR(100) NOT NULL COLLATE NOCASE,
+            TeacherID INTEGER REFERENCES Teachers(TeacherID) ON DELETE SET NULL
+        )
+    """),
+    ('Subjects', """
+        CREATE TABLE Subjects (
+            SubjectID INTEGER PRIMARY KEY AUTOINCREMENT,
+            SubjectName NVARCHAR(100) NOT NULL COLLATE NOCASE,
+            Description NVARCHAR(255)
+        )
+    """),
+    ('ClassSubjects', """
+        CREATE TABLE ClassSubjects (
+            ClassID INTEGER NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            SubjectID INTEGER NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            PRIMARY KEY (ClassID, SubjectID)
+        )
+    """),
+    ('Enrollments', """
+        CREATE TABLE Enrollments (
+            StudentID INTEGER NOT NULL REFERENCES Students(StudentID) ON DELETE CASCADE,
+            ClassID INTEGER NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            EnrollmentDate DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (StudentID, ClassID)
+        )
+    """),
+    ('Grades', """
+        CREATE TABLE Grades (
+            GradeID INTEGER PRIMARY KEY AUTOINCREMENT,
+            StudentID INTEGER NOT NULL REFERENCES Students(StudentID) ON DELETE CASCADE,
+            SubjectID INTEGER NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            ClassID INTEGER NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            Grade DECIMAL(5, 2) NOT NULL,
+            RecordedAt DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+        )
+    """),
+    ('GradeAggregates', """
+        CREATE TABLE GradeAggregates (
+            ClassID INTEGER NOT NULL REFERENCES Classes(ClassID) ON DELETE CASCADE,
+            SubjectID INTEGER NOT NULL REFERENCES Subjects(SubjectID) ON DELETE CASCADE,
+            GradeSum REAL NOT NULL DEFAULT 0,
+            GradeCount INTEGER NOT NULL DEFAULT 0,
+            MinGrade DECIMAL(5, 2),
+            MaxGrade DECIMAL(5, 2),
+            BandA INTEGER NOT NULL DEFAULT 0,
+            BandB INTEGER NOT NULL DEFAULT 0,
+            BandC INTEGER NOT NULL DEFAULT 0,
+            BandD INTEGER NOT NULL DEFAULT 0,
+            BandF INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ClassID, SubjectID)
+        )
+    """),
+]
+
+# Columns added after the first release: (table, column, statements per dialect).
+# Existing rows are backfilled with the time of the migration.
+ADDED_COLUMNS = [
+    ('Grades', 'RecordedAt', {
+        'sqlserver': [
+            "ALTER TABLE Grades ADD RecordedAt DATETIME2(0) NOT NULL "
+            "CONSTRAINT DF_Grades_RecordedAt DEFAULT GETDATE() WITH VALUES",
+        ],
+        'sqlite': [
+            # SQLite cannot add a column with a non-constant default, so fill it in afterwards
+            "ALTER TABLE Grades ADD COLUMN RecordedAt DATETIME",
+            "UPDATE Grades SET RecordedAt = datetime('now', 'localtime') WHERE RecordedAt IS NULL",
+        ],
+    }),
+]
+
+# Lower bounds of the A-D grade bands; anything below the last one is an F
+GRADE_BANDS = (90, 80, 70, 60)
+
+def grade_aggregates_select(where=""):
+    return f"""
+        INSERT INTO GradeAggregates
+            (ClassID, SubjectID, GradeSum, GradeCount, MinGrade, MaxGrade, BandA, BandB, BandC, BandD, BandF)
+        SELECT ClassID, SubjectID, SUM(Grade), COUNT(*), MIN(Grade), MAX(Grade),
+               SUM(CASE WHEN Grade >= {GRADE_BANDS[0]} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Grade >= {GRADE_BANDS[1]} AND Grade < {GRADE_BANDS[0]} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Grade >= {GRADE_BANDS[2]} AND Grade < {GRADE_BANDS[1]} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Grade >= {GRADE_BANDS[3]} AND Grade < {GRADE_BANDS[2]} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Grade < {GRADE_BANDS[3]} THEN 1 ELSE 0 END)
+        FROM Grades
+        {where}
+        GROUP BY ClassID, SubjectID
+    """
+
+def rebuild_grade_aggregates(cursor):
+    cursor.execute("DELETE FROM GradeAggregates")
+    cursor.execute(grade_aggregates_select())
+
+# (name, table, key columns, included columns)
+INDEXES = [
+    ('IX_Grades_ClassID_SubjectID', 'Grades', ('ClassID', 'SubjectID'), ('StudentID', 'Grade')),
+    ('IX_Grades_StudentID', 'Grades', ('StudentID',), ('ClassID', 'SubjectID', 'Grade')),
+    ('IX_Grades_RecordedAt', 'Grades', ('RecordedAt',), ('ClassID', 'SubjectID', 'StudentID', 'Grade')),
+    ('IX_Enrollments_ClassID_StudentID', 'Enrollments', ('ClassID', 'StudentID'), ('EnrollmentDate',)),
+    ('IX_Students_FullName', 'Students', ('FullName',), ()),
+    ('IX_Teachers_FullName', 'Teachers', ('FullName',), ()),
+    ('IX_Classes_ClassName', 'Classes', ('ClassName',), ()),
+    ('IX_Classes_TeacherID', 'Classes', ('TeacherID',), ('ClassName',)),
+    ('IX_Subjects_SubjectName', 'Subjects', ('SubjectName',), ()),
+]
+
+class SqlServerDialect:
+    tables = SQLSERVER_TABLES
+    table_exists_query = "SELECT 1 FROM sys.tables WHERE name = ?"
+    index_exists_query = "SELECT 1 FROM sys.indexes WHERE name = ? AND object_id = OBJECT_ID(?)"
+    column_exists_query = "SELECT 1 FROM sys.columns WHERE object_id = OBJECT_ID(?) AND name = ?"
+
+    def create_index_sql(self, name, table, columns, include):
+        sql = f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+        if include:
+            sql += f" INCLUDE ({', '.join(include)})"
+        return sql
+
+class SqliteDialect:
+    tables = SQLITE_TABLES
+    table_exists_query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    index_exists_query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ? AND tbl_name = ?"
+    column_exists_query = "SELECT 1 FROM pragma_table_info(?) WHERE name = ?"
+
+    def create_index_sql(self, name, table, columns, include):
+        # SQLite has no INCLUDE clause, so covered columns become trailing key columns
+        return f"CREATE INDEX {name} ON {table} ({', '.join(columns + include)})"
+
+DIALECTS = {
+    'sqlserver': SqlServerDialect(),
+    'sqlite': SqliteDialect(),
+}
+
+def apply_schema(connection, dialect_name):
+    dialect = DIALECTS[dialect_name]
+    cursor = connection.cursor()
+    created = []
+    try:
+        for table, ddl in dialect.tables:
+            cursor.execute(dialect.table_exists_query, (table,))
+            if cursor.fetchone() is None:
+                cursor.execute(ddl)
+                created.append(table)
+
+        for table, column, statements in ADDED_COLUMNS:
+            cursor.execute(dialect.column_exists_query, (table, column))
+            if cursor.fetchone() is None:
+                for statement in statements[dialect_name]:
+                    cursor.execute(statement)
+                created.append(f"{table}.{column}")
+
+        for name, table, columns, include in INDEXES:
+            cursor.execute(dialect.index_exists_query, (name, table))
+            if cursor.fetchone() is None:
+                cursor.execute(dialect.create_index_sql(name, table, columns, include))
+                created.append(name)
+
+        if 'GradeAggregates' in created:
+            rebuild_grade_aggregates(cursor)
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    for name in created:
+        print(f"Created {name}")
+    return created
+
+def migrate(backend):
+    if not backend.prepare():
+        return False
+
+    connection = backend.connect()
+    try:
+        apply_schema(connection, backend.name)
+    except backend.Error as e:
+        print(f"Error creating schema: {str(e)}")
+        return False
+    finally:
+        connection.close()
+
+    print(f"Schema on {backend.describe()} is up to date")
+    return True
+
+def main():
+    from database_backends import BACKENDS, get_default_backend
+
+    parser = argparse.ArgumentParser(description="Create or upgrade the School Management System schema")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help="storage backend (defaults to SCHOOL_DB_BACKEND)")
+    parser.add_argument('--path', help="database file for the sqlite backend")
+    parser.add_argument('--rebuild-aggregates', action='store_true',
+                        help="recompute the GradeAggregates table from Grades")
+    args = parser.parse_args()
+
+    if args.backend == 'sqlite':
+        backend = BACKENDS['sqlite'](args.path or 'school.db')
+    elif args.backend:
+        backend = BACKENDS[args.backend]()
+    else:
+        backend = get_default_backend()
+
+    if not migrate(backend):
+        return 1
+    if args.rebuild_aggregates:
+        from database_operations import DatabaseOperations
+        return 0 if DatabaseOperations(backend).rebuild_grade_aggregates() else 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
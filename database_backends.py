@@ -0,0 +1,164 @@
+import os
+import re
+import sqlite3
+import datetime
+
+from create_schema import apply_schema
+
+# Terms split the year into three four-month blocks starting in January, May and September
+TERM_MONTHS = 4
+
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
+class SqlServerBackend:
+    name = 'sqlserver'
+    display_name = 'SQL Server'
+    supports_batches = True
+
+    def __init__(self, server_name='Abdallah', database_name='school'):
+        self.SERVER_NAME = server_name
+        self.DATABASE_NAME = database_name
+        self._conn_str = None
+        self.Error = pyodbc.Error if pyodbc else Exception
+
+    def describe(self):
+        return f"{self.DATABASE_NAME} on {self.SERVER_NAME}"
+
+    def prepare(self):
+        if pyodbc is None:
+            print("pyodbc is not installed. Install it to connect to SQL Server.")
+            return False
+
+        drivers = [x for x in pyodbc.drivers() if x.endswith(' for SQL Server')]
+        if not drivers:
+            print("No SQL Server drivers found. Please install the SQL Server ODBC driver.")
+            return False
+
+        driver = drivers[0]
+        print(f"Using SQL Server driver: {driver}")
+
+        self._conn_str = (
+            f'DRIVER={{{driver}}};'
+            f'SERVER={self.SERVER_NAME};'
+            f'DATABASE={self.DATABASE_NAME};'
+            'Trusted_Connection=yes;'
+            'TrustServerCertificate=yes;'
+        )
+        return True
+
+    def connect(self):
+        return pyodbc.connect(self._conn_str)
+
+    def translate(self, query):
+        return query
+
+    def configure_bulk_cursor(self, cursor):
+        cursor.fast_executemany = True
+
+    def date_bucket_sql(self, period, column):
+        if period == 'week':
+            # Day 0 (1900-01-01) is a Monday, so whole weeks since then start on Mondays
+            return f"CAST(DATEADD(day, DATEDIFF(day, 0, {column}) / 7 * 7, 0) AS DATE)"
+        if period == 'month':
+            return f"DATEFROMPARTS(YEAR({column}), MONTH({column}), 1)"
+        if period == 'term':
+            return f"DATEFROMPARTS(YEAR({column}), (MONTH({column}) - 1) / {TERM_MONTHS} * {TERM_MONTHS} + 1, 1)"
+        raise ValueError(f"Unknown period '{period}'")
+
+def _convert_date(value):
+    return datetime.date.fromisoformat(value.decode())
+
+def _convert_datetime(value):
+    return datetime.datetime.fromisoformat(value.decode())
+
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('DATETIME', _convert_datetime)
+
+class SqliteBackend:
+    name = 'sqlite'
+    display_name = 'SQLite'
+    supports_batches = False
+    Error = sqlite3.Error
+
+    TRANSLATIONS = [
+        (re.compile(r'\bISNULL\s*\(', re.IGNORECASE), 'IFNULL('),
+        (re.compile(r'\bSTRING_AGG\s*\(\s*CONVERT\s*\(\s*NVARCHAR\s*\(\s*MAX\s*\)\s*,\s*([^()]+?)\s*\)\s*,', re.IGNORECASE),
+         r'GROUP_CONCAT(\1,'),
+        (re.compile(r'\bSTRING_AGG\s*\(', re.IGNORECASE), 'GROUP_CONCAT('),
+        # GROUP_CONCAT takes no ordering clause before SQLite 3.44
+        (re.compile(r'\)\s*WITHIN\s+GROUP\s*\(\s*ORDER\s+BY\s+[^()]+\)', re.IGNORECASE), ')'),
+        (re.compile(r'\bCONVERT\s*\(\s*NVARCHAR\s*\(\s*MAX\s*\)\s*,\s*([^()]+?)\s*\)', re.IGNORECASE),
+         r'CAST(\1 AS TEXT)'),
+        (re.compile(r'\bGETDATE\s*\(\s*\)', re.IGNORECASE), 'CURRENT_TIMESTAMP'),
+        # SQLite locks the whole database for writes, so table hints have nothing to add
+        (re.compile(r'\s+WITH\s*\(\s*(?:UPDLOCK|HOLDLOCK|ROWLOCK|NOLOCK)(?:\s*,\s*(?:UPDLOCK|HOLDLOCK|ROWLOCK|NOLOCK))*\s*\)',
+                    re.IGNORECASE), ''),
+        (re.compile(r'\bOFFSET\s+(\S+)\s+ROWS\s+FETCH\s+NEXT\s+(\S+)\s+ROWS\s+ONLY', re.IGNORECASE),
+         r'LIMIT \1, \2'),
+    ]
+
+    def __init__(self, path='school.db'):
+        self.path = path
+        self._translated = {}
+
+    def describe(self):
+        return os.path.abspath(self.path)
+
+    def prepare(self):
+        connection = self.connect()
+        try:
+            apply_schema(connection, self.name)
+        finally:
+            connection.close()
+        return True
+
+    def connect(self):
+        connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA journal_mode = WAL")
+        return connection
+
+    def translate(self, query):
+        translated = self._translated.get(query)
+        if translated is None:
+            translated = query
+            for pattern, replacement in self.TRANSLATIONS:
+                translated = pattern.sub(replacement, translated)
+            self._translated[query] = translated
+        return translated
+
+    def configure_bulk_cursor(self, cursor):
+        pass
+
+    def date_bucket_sql(self, period, column):
+        if period == 'week':
+            return f"date({column}, '-' || ((CAST(strftime('%w', {column}) AS INTEGER) + 6) % 7) || ' days')"
+        if period == 'month':
+            return f"strftime('%Y-%m-01', {column})"
+        if period == 'term':
+            return (f"printf('%s-%02d-01', strftime('%Y', {column}), "
+                    f"(CAST(strftime('%m', {column}) AS INTEGER) - 1) / {TERM_MONTHS} * {TERM_MONTHS} + 1)")
+        raise ValueError(f"Unknown period '{period}'")
+
+BACKENDS = {
+    SqlServerBackend.name: SqlServerBackend,
+    SqliteBackend.name: SqliteBackend,
+}
+
+def get_default_backend():
+    name = os.environ.get('SCHOOL_DB_BACKEND', SqlServerBackend.name).lower()
+    if name == SqliteBackend.name:
+        return SqliteBackend(os.environ.get('SCHOOL_DB_PATH', 'school.db'))
+    if name not in BACKENDS:
+        print(f"Unknown database backend '{name}', falling back to {SqlServerBackend.display_name}")
+    return SqlServerBackend()
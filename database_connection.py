@@ -1,89 +1,319 @@
-import pyodbc
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
-class DatabaseConnection:
-    def __init__(self):
-        self.SERVER_NAME = 'Abdallah'
-        self.DATABASE_NAME = 'school'
-        self.connection = None
-        self.cursor = None
+from database_backends import get_default_backend
+
+class PoolTimeoutError(Exception):
+    pass
+
+class ConnectionPool:
+    def __init__(self, factory, max_size=5, timeout=30.0, health_check_query="SELECT 1",
+                 health_check_interval=30.0):
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_query = health_check_query
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._created = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._timeouts = 0
+        self._health_check_failures = 0
+
+    def acquire(self):
+        if self._closed:
+            raise PoolTimeoutError("Connection pool is closed")
+
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeoutError(f"No database connection available after {self.timeout:.1f}s")
+        waited = time.perf_counter() - started
 
-    def connect(self):
         try:
-            drivers = [x for x in pyodbc.drivers() if x.endswith(' for SQL Server')]
-            if not drivers:
-                print("No SQL Server drivers found. Please install the SQL Server ODBC driver.")
-                return False
-            
-            driver = drivers[0]
-            print(f"Using SQL Server driver: {driver}")
-            
-            conn_str = (
-                f'DRIVER={{{driver}}};'
-                f'SERVER={self.SERVER_NAME};'
-                f'DATABASE={self.DATABASE_NAME};'
-                'Trusted_Connection=yes;'
-                'TrustServerCertificate=yes;'
-            )
-            
-            print(f"Attempting to connect to {self.SERVER_NAME}...")
-            self.connection = pyodbc.connect(conn_str)
-            self.cursor = self.connection.cursor()
-            print(f"Successfully connected to {self.DATABASE_NAME} on {self.SERVER_NAME}")
+            connection = self._checkout_idle()
+            if connection is None:
+                connection = self.factory()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._total_wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        return connection
+
+    def release(self, connection, discard=False, dirty=False):
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if discard or self._closed:
+                self._close_connection(connection)
+            else:
+                # Clean returns skip the rollback, which would cost a server round trip on every read
+                if dirty:
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        self._close_connection(connection)
+                        return
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        broken = False
+        dirty = False
+        try:
+            yield connection
+        except Exception:
+            dirty = True
+            broken = not self._is_healthy(connection)
+            raise
+        finally:
+            self.release(connection, discard=broken, dirty=dirty)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_connection(connection)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                'max_size': self.max_size,
+                'created': self._created,
+                'idle': self._idle.qsize(),
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'utilisation': self._in_use / self.max_size if self.max_size else 0.0,
+                'checkouts': checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'total_wait_time': self._total_wait_time,
+                'avg_wait_time': self._total_wait_time / checkouts if checkouts else 0.0,
+                'max_wait_time': self._max_wait_time,
+                'health_check_failures': self._health_check_failures,
+            }
+
+    def _checkout_idle(self):
+        while True:
+            try:
+                connection, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - idle_since < self.health_check_interval:
+                return connection
+            if self._is_healthy(connection):
+                return connection
+            with self._lock:
+                self._health_check_failures += 1
+            self._close_connection(connection)
+
+    def _is_healthy(self, connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
             return True
-            
-        except pyodbc.Error as e:
-            print(f"Error connecting to SQL Server: {str(e)}")
+        except Exception:
             return False
+
+    def _close_connection(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+class Transaction:
+    def __init__(self, connection):
+        self.connection = connection
+        self.failed = connection is None
+        self.committed = False
+        self._on_finish = []
+
+    def mark_failed(self):
+        self.failed = True
+
+    def on_finish(self, callback):
+        self._on_finish.append(callback)
+
+    def finish(self):
+        if self.connection is None:
+            return
+        try:
+            if self.failed:
+                self.connection.rollback()
+            else:
+                self.connection.commit()
+                self.committed = True
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            return False
+            print(f"Error finishing transaction: {str(e)}")
+            self.failed = True
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+        finally:
+            for callback in self._on_finish:
+                callback()
+
+class DatabaseConnection:
+    def __init__(self, backend=None, pool_size=5, pool_timeout=30.0):
+        self.backend = backend or get_default_backend()
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.pool = None
+        self._connect_lock = threading.Lock()
+        self._local = threading.local()
+
+    def connect(self):
+        with self._connect_lock:
+            if self.pool:
+                return True
+            try:
+                if not self.backend.prepare():
+                    return False
+
+                print(f"Attempting to connect to {self.backend.describe()}...")
+                pool = ConnectionPool(self.backend.connect, max_size=self.pool_size, timeout=self.pool_timeout)
+                pool.release(pool.acquire())
+                self.pool = pool
+                print(f"Successfully connected to {self.backend.describe()}")
+                return True
+
+            except self.backend.Error as e:
+                print(f"Error connecting to {self.backend.display_name}: {str(e)}")
+                return False
+            except Exception as e:
+                print(f"Unexpected error: {str(e)}")
+                return False
 
     def disconnect(self):
         try:
-            if self.cursor:
-                self.cursor.close()
-            if self.connection:
-                self.connection.close()
+            if self.pool:
+                self.pool.close()
                 print("Database connection closed")
         except Exception as e:
             print(f"Error disconnecting from database: {str(e)}")
         finally:
-            self.connection = None
-            self.cursor = None
+            self.pool = None
 
-    def get_cursor(self):
-        if not self.connection or not self.cursor:
-            if not self.connect():
-                return None
-        return self.cursor
+    def current_transaction(self):
+        return getattr(self._local, 'transaction', None)
+
+    @contextmanager
+    def transaction(self):
+        current = self.current_transaction()
+        if current is not None:
+            try:
+                yield current
+            except Exception:
+                current.mark_failed()
+                raise
+            return
+
+        with self.borrow() as connection:
+            transaction = Transaction(connection)
+            self._local.transaction = transaction
+            try:
+                yield transaction
+            except Exception:
+                transaction.mark_failed()
+                raise
+            finally:
+                self._local.transaction = None
+                transaction.finish()
+
+    @contextmanager
+    def borrow(self):
+        transaction = self.current_transaction()
+        if transaction is not None:
+            yield transaction.connection
+            return
+        if not self.pool and not self.connect():
+            yield None
+            return
+        with self.pool.connection() as connection:
+            yield connection
+
+    def translate(self, query):
+        return self.backend.translate(query)
+
+    def pool_stats(self):
+        return self.pool.stats() if self.pool else None
 
     def execute_query(self, query, params=None):
+        transaction = self.current_transaction()
         try:
-            cursor = self.get_cursor()
-            if cursor:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                self.connection.commit()
-                return True
-        except pyodbc.Error as e:
+            with self.borrow() as connection:
+                if connection:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.translate(query), params)
+                        else:
+                            cursor.execute(self.translate(query))
+                    finally:
+                        cursor.close()
+                    if transaction is None:
+                        connection.commit()
+                    return True
+                return False
+        except self.backend.Error as e:
             print(f"Database error: {str(e)}")
-            return False
         except Exception as e:
             print(f"Error executing query: {str(e)}")
-            return False
+        if transaction is not None:
+            transaction.mark_failed()
+        return False
 
     def fetch_all(self, query, params=None):
         try:
-            cursor = self.get_cursor()
-            if cursor:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchall()
-        except pyodbc.Error as e:
+            with self.borrow() as connection:
+                if connection:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.translate(query), params)
+                        else:
+                            cursor.execute(self.translate(query))
+                        return cursor.fetchall()
+                    finally:
+                        cursor.close()
+                return []
+        except self.backend.Error as e:
             print(f"Database error: {str(e)}")
             return []
         except Exception as e:
@@ -92,16 +322,22 @@ class DatabaseConnection:
 
     def fetch_one(self, query, params=None):
         try:
-            cursor = self.get_cursor()
-            if cursor:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchone()
-        except pyodbc.Error as e:
+            with self.borrow() as connection:
+                if connection:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.translate(query), params)
+                        else:
+                            cursor.execute(self.translate(query))
+                        # Closing drops any rows left behind fetchone, so the pooled connection is free again
+                        return cursor.fetchone()
+                    finally:
+                        cursor.close()
+                return None
+        except self.backend.Error as e:
             print(f"Database error: {str(e)}")
             return None
         except Exception as e:
             print(f"Error fetching data: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
@@ -1,58 +1,349 @@
+import re
+import time
 from typing import List, Optional
 from datetime import datetime, date
+import threading
+from itertools import islice
+from contextlib import closing
+from collections import namedtuple
 from database_connection import DatabaseConnection
+from entity_cache import LRUCache
+from create_schema import GRADE_BANDS, grade_aggregates_select
+
+BulkInsertResult = namedtuple('BulkInsertResult', ['inserted', 'failed'])
+DashboardSnapshot = namedtuple('DashboardSnapshot', [
+    'class_averages', 'subject_averages', 'gender_distribution', 'enrollment_counts', 'grade_distribution'
+])
 
 class DatabaseOperations:
-    def __init__(self):
-        self.db = DatabaseConnection()
+    BULK_CHUNK_SIZE = 1000
+    SEARCH_LIMIT = 200
+    FETCH_PAGE_SIZE = 2000
+    FETCH_BATCH_SIZE = 500
+    PAGE_BOOKMARK_SIZE = 1024
+    CACHE_SIZE = 512
+    CACHE_TTL = 300.0
+    GRADE_BAND_LABELS = ('A (90-100)', 'B (80-89)', 'C (70-79)', 'D (60-69)', 'F (Below 60)')
+    REPORT_QUANTILES = (0.5, 0.1, 0.9)
+    # Other clients' grade edits are only picked up by a full reload, so the columnar store is reloaded this often
+    GRADE_STORE_TTL = 300.0
+    # Deleting rows from these tables cascades into Grades behind the store's back
+    GRADE_STORE_TABLES = ('Students', 'Classes', 'Subjects')
+    WRITE_PATTERN = re.compile(r'^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)', re.IGNORECASE)
+    # Rows removed from these tables by ON DELETE CASCADE / SET NULL when a row of the key table is deleted
+    DELETE_CASCADES = {
+        'Students': ('Enrollments', 'Grades'),
+        'Teachers': ('Classes',),
+        'Classes': ('ClassSubjects', 'Enrollments', 'Grades', 'GradeAggregates'),
+        'Subjects': ('ClassSubjects', 'Grades', 'GradeAggregates'),
+    }
+    HOURS_PER_SUBJECT = 3
+    LOOKUP_LIMIT = 20
+    LOOKUP_CACHE_SIZE = 256
+    # source -> (table, ID column, name column); each name column has an index for prefix lookups
+    LOOKUP_SOURCES = {
+        'students': ('Students', 'StudentID', 'FullName'),
+        'teachers': ('Teachers', 'TeacherID', 'FullName'),
+        'classes': ('Classes', 'ClassID', 'ClassName'),
+        'subjects': ('Subjects', 'SubjectID', 'SubjectName'),
+    }
+    TREND_PERIODS = ('week', 'month', 'term')
+    # group -> (label column, join that brings it in)
+    TREND_GROUPS = {
+        'class': ('c.ClassName', "JOIN Classes c ON g.ClassID = c.ClassID"),
+        'subject': ('sub.SubjectName', "JOIN Subjects sub ON g.SubjectID = sub.SubjectID"),
+        'student': ('s.FullName', "JOIN Students s ON g.StudentID = s.StudentID"),
+    }
+
+    def __init__(self, backend=None, connect=True):
+        self.db = DatabaseConnection(backend)
+        self.cache = LRUCache(self.CACHE_SIZE, self.CACHE_TTL)
+        self.lookup_cache = LRUCache(self.LOOKUP_CACHE_SIZE, self.CACHE_TTL)
+        self.page_bookmarks = LRUCache(self.PAGE_BOOKMARK_SIZE, self.CACHE_TTL)
+        self.grade_store = None
+        self._grade_store_lock = threading.Lock()
+        self._grade_store_versions = None
+        self._grade_store_loaded = 0.0
+        self._table_versions = {}
+        self._versions_lock = threading.Lock()
+        if connect:
+            self.connect()
+
+    def connect(self):
+        # Queries issued before this finishes wait for the same connection attempt instead of starting another
         if self.db.connect():
             print("\nConnected to database successfully")
-        else:
-            print("Failed to connect to database")
+            return True
+        print("Failed to connect to database")
+        return False
+
+    def transaction(self):
+        return self.db.transaction()
 
     def execute_query(self, query, params=None):
-        cursor = self.db.get_cursor()
-        if cursor:
-            try:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                self.db.connection.commit()
-                return True
-            except Exception as e:
-                print(f"Error executing query: {str(e)}")
-                return False
+        transaction = self.db.current_transaction()
+        with self.db.borrow() as connection:
+            if connection:
+                try:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.db.translate(query), params)
+                        else:
+                            cursor.execute(self.db.translate(query))
+                    finally:
+                        cursor.close()
+                    if transaction is None:
+                        connection.commit()
+                    self._record_write(query)
+                    return True
+                except Exception as e:
+                    print(f"Error executing query: {str(e)}")
+                    if transaction is not None:
+                        transaction.mark_failed()
+                    else:
+                        self._rollback(connection)
+                    return False
         return False
 
+    @staticmethod
+    def _rollback(connection):
+        # Pooled connections are only rolled back on release when the borrow raised
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+
     def fetch_all(self, query, params=None):
-        cursor = self.db.get_cursor()
-        if cursor:
-            try:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchall()
-            except Exception as e:
-                print(f"Error fetching data: {str(e)}")
-                return []
+        with self.db.borrow() as connection:
+            if connection:
+                try:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.db.translate(query), params)
+                        else:
+                            cursor.execute(self.db.translate(query))
+                        return cursor.fetchall()
+                    finally:
+                        cursor.close()
+                except Exception as e:
+                    print(f"Error fetching data: {str(e)}")
+                    return []
         return []
 
     def fetch_one(self, query, params=None):
-        cursor = self.db.get_cursor()
-        if cursor:
-            try:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchone()
-            except Exception as e:
-                print(f"Error fetching data: {str(e)}")
+        with self.db.borrow() as connection:
+            if connection:
+                try:
+                    cursor = connection.cursor()
+                    try:
+                        if params:
+                            cursor.execute(self.db.translate(query), params)
+                        else:
+                            cursor.execute(self.db.translate(query))
+                        # Closing drops any rows left behind fetchone, so the pooled connection is free again
+                        return cursor.fetchone()
+                    finally:
+                        cursor.close()
+                except Exception as e:
+                    print(f"Error fetching data: {str(e)}")
+                    return None
+        return None
+
+    def execute_many(self, query, rows, chunk_size=None):
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        inserted = 0
+        failed = []
+        rows = iter(rows)
+        transaction = self.db.current_transaction()
+        with self.db.borrow() as connection:
+            if not connection:
+                return BulkInsertResult(0, [(index, row, "No database connection") for index, row in enumerate(rows)])
+
+            query = self.db.translate(query)
+            start = 0
+            while True:
+                chunk = [tuple(row) for row in islice(rows, chunk_size)]
+                if not chunk:
+                    break
+
+                cursor = connection.cursor()
+                self.db.backend.configure_bulk_cursor(cursor)
+                try:
+                    cursor.executemany(query, chunk)
+                    cursor.close()
+                    if transaction is None:
+                        connection.commit()
+                    inserted += len(chunk)
+                except Exception as e:
+                    cursor.close()
+                    if transaction is not None:
+                        print(f"Bulk chunk at row {start} failed inside a transaction: {str(e)}")
+                        transaction.mark_failed()
+                        failed.extend((start + offset, row, str(e)) for offset, row in enumerate(chunk))
+                        failed.extend((start + len(chunk) + offset, tuple(row), "Transaction aborted")
+                                      for offset, row in enumerate(rows))
+                        break
+                    connection.rollback()
+                    print(f"Bulk chunk at row {start} failed ({str(e)}), retrying row by row")
+                    cursor = connection.cursor()
+                    try:
+                        for offset, row in enumerate(chunk):
+                            try:
+                                cursor.execute(query, row)
+                                inserted += 1
+                            except Exception as row_error:
+                                failed.append((start + offset, row, str(row_error)))
+                    finally:
+                        cursor.close()
+                    connection.commit()
+                start += len(chunk)
+
+        print(f"Bulk insert finished: {inserted} rows inserted, {len(failed)} failed")
+        if inserted:
+            self._record_write(query)
+        return BulkInsertResult(inserted, failed)
+
+    def iter_keyset(self, query, start_params, next_params, page_size=None, batch_size=None):
+        page_size = page_size or self.FETCH_PAGE_SIZE
+        batch_size = batch_size or self.FETCH_BATCH_SIZE
+        params = start_params
+        while True:
+            fetched = 0
+            last_row = None
+            with self.db.borrow() as connection:
+                if not connection:
+                    return
+                cursor = connection.cursor()
+                # A caller that stops early (islice, break) closes the generator here, so the cursor is
+                # closed before the connection goes back to the pool with part of a result set pending
+                try:
+                    try:
+                        cursor.execute(self.db.translate(query), tuple(params) + (page_size,))
+                    except Exception as e:
+                        print(f"Error fetching data: {str(e)}")
+                        return
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        fetched += len(rows)
+                        last_row = rows[-1]
+                        yield from rows
+                finally:
+                    cursor.close()
+            if fetched < page_size:
+                return
+            params = next_params(last_row)
+
+    def _keyset_page(self, name, tables, filter_params, offset, limit, page_query, key_query, first_key, next_key):
+        # Bookmarks remember where each page ended, so scrolling on seeks from there instead of using OFFSET
+        versions = self.get_table_versions(tables)
+        key = first_key if offset == 0 else self.page_bookmarks.get((name, filter_params, offset, versions))
+        if key is None:
+            # A jump past the pages read so far: find the row before it from the key columns alone, without joins or a sort
+            row = self.fetch_one(key_query, filter_params + (offset - 1,))
+            if row is None:
+                return []
+            key = tuple(row)
+        pages = self.iter_keyset(page_query, key + filter_params, lambda row: next_key(row) + filter_params, page_size=limit)
+        with closing(pages):
+            rows = list(islice(pages, limit))
+        if rows:
+            self.page_bookmarks.put((name, filter_params, offset + len(rows), versions), next_key(rows[-1]))
+        return rows
+
+    @staticmethod
+    def _prefix_pattern(term):
+        escaped = term.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('[', '\\[')
+        return escaped + '%'
+
+    def lookup_names(self, source, prefix='', limit=None):
+        table, id_column, name_column = self.LOOKUP_SOURCES[source]
+        prefix = prefix.strip()
+        limit = limit or self.LOOKUP_LIMIT
+        # Keying on the table version means any write through this instance retires older entries
+        version = self.get_table_versions((table,))[0]
+        key = (source, prefix.casefold(), limit, version)
+        rows = self.lookup_cache.get(key)
+        if rows is not None:
+            return rows
+
+        rows = self._narrow_cached_lookup(source, prefix, limit, version)
+        if rows is None:
+            query = f"""
+                SELECT {id_column}, {name_column}
+                FROM {table}
+                WHERE {name_column} LIKE ? ESCAPE '\\'
+                ORDER BY {name_column}, {id_column}
+                OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+            """
+            rows = [tuple(row) for row in self.fetch_all(query, (self._prefix_pattern(prefix), limit))]
+        self.lookup_cache.put(key, rows)
+        return rows
+
+    def _narrow_cached_lookup(self, source, prefix, limit, version):
+        folded = prefix.casefold()
+        for length in range(len(folded) - 1, -1, -1):
+            rows = self.lookup_cache.get((source, folded[:length], limit, version))
+            if rows is None:
+                continue
+            if len(rows) >= limit:
+                # The shorter prefix was cut off at the limit, so it may be missing matches for this one
                 return None
+            return [row for row in rows if (row[1] or '').casefold().startswith(folded)]
         return None
 
+    def get_lookup_cache_stats(self):
+        return self.lookup_cache.stats()
+
+    def get_pool_stats(self):
+        return self.db.pool_stats()
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def get_table_versions(self, tables):
+        with self._versions_lock:
+            return tuple(self._table_versions.get(table, 0) for table in tables)
+
+    def _record_write(self, query):
+        match = self.WRITE_PATTERN.match(query)
+        if not match:
+            return
+        tables = (match.group(2),)
+        if match.group(1).upper().startswith('DELETE'):
+            tables += self.DELETE_CASCADES.get(match.group(2), ())
+
+        def bump():
+            with self._versions_lock:
+                for table in tables:
+                    self._table_versions[table] = self._table_versions.get(table, 0) + 1
+
+        bump()
+        transaction = self.db.current_transaction()
+        if transaction is not None:
+            # Bump again once the transaction ends so readers that saw the first bump mid-transaction refresh
+            transaction.on_finish(bump)
+
+    def _cached(self, key, loader):
+        if self.db.current_transaction() is not None:
+            return loader()
+        return self.cache.get_or_load(key, loader)
+
+    def _invalidate(self, *keys, namespaces=()):
+        def invalidate():
+            for key in keys:
+                self.cache.invalidate(key)
+            for namespace in namespaces:
+                self.cache.invalidate_namespace(namespace)
+
+        invalidate()
+        transaction = self.db.current_transaction()
+        if transaction is not None:
+            transaction.on_finish(invalidate)
+
     def add_student(self, name, dob, gender, email, phone, address):
         query = """
             INSERT INTO Students (FullName, DOB, Gender, Email, Phone, Address) 
@@ -60,6 +351,13 @@ class DatabaseOperations:
         """
         return self.execute_query(query, (name, dob, gender, email, phone, address))
 
+    def add_students_bulk(self, students, chunk_size=None):
+        query = """
+            INSERT INTO Students (FullName, DOB, Gender, Email, Phone, Address) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        return self.execute_many(query, students, chunk_size)
+
     def get_all_students(self):
         print("Fetching all students...")
         query = "SELECT StudentID, FullName, DOB, Gender, Email, Phone, Address FROM Students ORDER BY StudentID"
@@ -67,9 +365,52 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} students")
         return results
 
+    def iter_students(self, page_size=None, batch_size=None):
+        query = """
+            SELECT StudentID, FullName, DOB, Gender, Email, Phone, Address
+            FROM Students
+            WHERE StudentID > ?
+            ORDER BY StudentID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        return self.iter_keyset(query, (0,), lambda row: (row[0],), page_size, batch_size)
+
+    def count_students(self):
+        row = self.fetch_one("SELECT COUNT(*) FROM Students")
+        return row[0] if row else 0
+
+    def get_students_page(self, offset, limit):
+        page_query = """
+            SELECT StudentID, FullName, DOB, Gender, Email, Phone, Address
+            FROM Students
+            WHERE StudentID > ?
+            ORDER BY StudentID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        key_query = """
+            SELECT StudentID
+            FROM Students
+            ORDER BY StudentID
+            OFFSET ? ROWS FETCH NEXT 1 ROWS ONLY
+        """
+        return self._keyset_page('students', ('Students',), (), offset, limit,
+                                 page_query, key_query, (0,), lambda row: (row[0],))
+
+    def search_students(self, term, limit=None):
+        query = """
+            SELECT StudentID, FullName, DOB, Gender, Email, Phone, Address
+            FROM Students
+            WHERE FullName LIKE ? ESCAPE '\\'
+            ORDER BY FullName
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        results = self.fetch_all(query, (self._prefix_pattern(term), limit or self.SEARCH_LIMIT))
+        print(f"Found {len(results) if results else 0} students matching '{term}'")
+        return results
+
     def get_student(self, student_id):
         query = "SELECT StudentID, FullName, DOB, Gender, Email, Phone, Address FROM Students WHERE StudentID = ?"
-        return self.fetch_one(query, (student_id,))
+        return self._cached(('student', str(student_id)), lambda: self.fetch_one(query, (student_id,)))
 
     def update_student(self, student_id, name, dob, gender, email, phone, address):
         query = """
@@ -77,11 +418,20 @@ class DatabaseOperations:
             SET FullName = ?, DOB = ?, Gender = ?, Email = ?, Phone = ?, Address = ? 
             WHERE StudentID = ?
         """
-        return self.execute_query(query, (name, dob, gender, email, phone, address, student_id))
+        result = self.execute_query(query, (name, dob, gender, email, phone, address, student_id))
+        self._invalidate(('student', str(student_id)))
+        return result
 
     def delete_student(self, student_id):
         query = "DELETE FROM Students WHERE StudentID = ?"
-        return self.execute_query(query, (student_id,))
+        with self.transaction() as transaction:
+            groups = self.fetch_all("SELECT DISTINCT ClassID, SubjectID FROM Grades WHERE StudentID = ?", (student_id,))
+            deleted = self.execute_query(query, (student_id,))
+            if deleted:
+                self._recompute_grade_aggregates(groups)
+        self._invalidate(('student', str(student_id)))
+        # committed stays False until an outer transaction this call joined finishes, so it cannot be the result
+        return deleted and not transaction.failed
 
     def add_teacher(self, name, department, email, phone):
         query = """
@@ -97,9 +447,21 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} teachers")
         return results
 
+    def search_teachers(self, term, limit=None):
+        query = """
+            SELECT TeacherID, FullName, Department, Email, Phone
+            FROM Teachers
+            WHERE FullName LIKE ? ESCAPE '\\'
+            ORDER BY FullName
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        results = self.fetch_all(query, (self._prefix_pattern(term), limit or self.SEARCH_LIMIT))
+        print(f"Found {len(results) if results else 0} teachers matching '{term}'")
+        return results
+
     def get_teacher(self, teacher_id):
         query = "SELECT TeacherID, FullName, Department, Email, Phone FROM Teachers WHERE TeacherID = ?"
-        return self.fetch_one(query, (teacher_id,))
+        return self._cached(('teacher', str(teacher_id)), lambda: self.fetch_one(query, (teacher_id,)))
 
     def update_teacher(self, teacher_id, name, department, email, phone):
         query = """
@@ -107,20 +469,29 @@ class DatabaseOperations:
             SET FullName = ?, Department = ?, Email = ?, Phone = ? 
             WHERE TeacherID = ?
         """
-        return self.execute_query(query, (name, department, email, phone, teacher_id))
+        result = self.execute_query(query, (name, department, email, phone, teacher_id))
+        self._invalidate(('teacher', str(teacher_id)), ('classes',))
+        return result
 
     def delete_teacher(self, teacher_id):
         query = "DELETE FROM Teachers WHERE TeacherID = ?"
-        return self.execute_query(query, (teacher_id,))
+        result = self.execute_query(query, (teacher_id,))
+        self._invalidate(('teacher', str(teacher_id)), ('classes',), namespaces=('class',))
+        return result
 
     def add_class(self, name, teacher_id=None):
         query = """
             INSERT INTO Classes (ClassName, TeacherID) 
             VALUES (?, ?)
         """
-        return self.execute_query(query, (name, teacher_id))
+        result = self.execute_query(query, (name, teacher_id))
+        self._invalidate(('classes',))
+        return result
 
     def get_all_classes(self):
+        return self._cached(('classes',), self._load_all_classes)
+
+    def _load_all_classes(self):
         print("Fetching all classes...")
         query = """
             SELECT c.ClassID, c.ClassName, ISNULL(t.FullName, 'No Teacher') as TeacherName
@@ -132,35 +503,69 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} classes")
         return results
 
+    def search_classes(self, term, limit=None):
+        query = """
+            SELECT c.ClassID, c.ClassName, ISNULL(t.FullName, 'No Teacher') as TeacherName
+            FROM Classes c
+            LEFT JOIN Teachers t ON c.TeacherID = t.TeacherID
+            WHERE c.ClassName LIKE ? ESCAPE '\\'
+            ORDER BY c.ClassName
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        results = self.fetch_all(query, (self._prefix_pattern(term), limit or self.SEARCH_LIMIT))
+        print(f"Found {len(results) if results else 0} classes matching '{term}'")
+        return results
+
     def get_class(self, class_id):
         query = "SELECT ClassID, ClassName, TeacherID FROM Classes WHERE ClassID = ?"
-        return self.fetch_one(query, (class_id,))
+        return self._cached(('class', str(class_id)), lambda: self.fetch_one(query, (class_id,)))
 
     def assign_teacher_to_class(self, class_id, teacher_id):
         query = "UPDATE Classes SET TeacherID = ? WHERE ClassID = ?"
-        return self.execute_query(query, (teacher_id, class_id))
+        result = self.execute_query(query, (teacher_id, class_id))
+        self._invalidate(('class', str(class_id)), ('classes',))
+        return result
 
     def delete_class(self, class_id):
         query = "DELETE FROM Classes WHERE ClassID = ?"
-        return self.execute_query(query, (class_id,))
+        result = self.execute_query(query, (class_id,))
+        self._invalidate(('class', str(class_id)), ('classes',))
+        return result
 
     def add_subject(self, name, description):
         query = """
             INSERT INTO Subjects (SubjectName, Description) 
             VALUES (?, ?)
         """
-        return self.execute_query(query, (name, description))
+        result = self.execute_query(query, (name, description))
+        self._invalidate(('subjects',))
+        return result
 
     def get_all_subjects(self):
+        return self._cached(('subjects',), self._load_all_subjects)
+
+    def _load_all_subjects(self):
         print("Fetching all subjects...")
         query = "SELECT SubjectID, SubjectName, Description FROM Subjects ORDER BY SubjectID"
         results = self.fetch_all(query)
         print(f"Found {len(results) if results else 0} subjects")
         return results
 
+    def search_subjects(self, term, limit=None):
+        query = """
+            SELECT SubjectID, SubjectName, Description
+            FROM Subjects
+            WHERE SubjectName LIKE ? ESCAPE '\\'
+            ORDER BY SubjectName
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        results = self.fetch_all(query, (self._prefix_pattern(term), limit or self.SEARCH_LIMIT))
+        print(f"Found {len(results) if results else 0} subjects matching '{term}'")
+        return results
+
     def get_subject(self, subject_id):
         query = "SELECT SubjectID, SubjectName, Description FROM Subjects WHERE SubjectID = ?"
-        return self.fetch_one(query, (subject_id,))
+        return self._cached(('subject', str(subject_id)), lambda: self.fetch_one(query, (subject_id,)))
 
     def update_subject(self, subject_id, name, description):
         query = """
@@ -168,11 +573,15 @@ class DatabaseOperations:
             SET SubjectName = ?, Description = ? 
             WHERE SubjectID = ?
         """
-        return self.execute_query(query, (name, description, subject_id))
+        result = self.execute_query(query, (name, description, subject_id))
+        self._invalidate(('subject', str(subject_id)), ('subjects',))
+        return result
 
     def delete_subject(self, subject_id):
         query = "DELETE FROM Subjects WHERE SubjectID = ?"
-        return self.execute_query(query, (subject_id,))
+        result = self.execute_query(query, (subject_id,))
+        self._invalidate(('subject', str(subject_id)), ('subjects',))
+        return result
 
     def assign_subject_to_class(self, class_id, subject_id):
         query = "INSERT INTO ClassSubjects (ClassID, SubjectID) VALUES (?, ?)"
@@ -192,6 +601,10 @@ class DatabaseOperations:
         query = "INSERT INTO Enrollments (StudentID, ClassID) VALUES (?, ?)"
         return self.execute_query(query, (student_id, class_id))
 
+    def enroll_students_bulk(self, enrollments, chunk_size=None):
+        query = "INSERT INTO Enrollments (StudentID, ClassID) VALUES (?, ?)"
+        return self.execute_many(query, enrollments, chunk_size)
+
     def get_all_enrollments(self):
         print("Fetching all enrollments...")
         query = """
@@ -205,6 +618,63 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} enrollments")
         return results
 
+    def iter_enrollments(self, page_size=None, batch_size=None):
+        query = """
+            SELECT e.StudentID, s.FullName, c.ClassName, e.EnrollmentDate, e.ClassID
+            FROM Enrollments e
+            JOIN Students s ON e.StudentID = s.StudentID
+            JOIN Classes c ON e.ClassID = c.ClassID
+            WHERE e.StudentID >= ? AND (e.StudentID > ? OR e.ClassID > ?)
+            ORDER BY e.StudentID, e.ClassID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        return self.iter_keyset(query, (0, 0, 0), lambda row: (row[0], row[0], row[4]), page_size, batch_size)
+
+    def _enrollment_filters(self, class_name, name_prefix):
+        clause = ""
+        params = []
+        
+        if class_name and class_name != 'All Classes':
+            clause += " AND e.ClassID IN (SELECT ClassID FROM Classes WHERE ClassName = ?)"
+            params.append(class_name)
+            
+        if name_prefix and name_prefix.strip():
+            clause += " AND e.StudentID IN (SELECT StudentID FROM Students WHERE FullName LIKE ? ESCAPE '\\')"
+            params.append(self._prefix_pattern(name_prefix))
+            
+        return clause, params
+
+    def count_enrollments(self, class_name=None, name_prefix=None):
+        query = """
+            SELECT COUNT(*)
+            FROM Enrollments e
+            WHERE 1=1
+        """
+        clause, params = self._enrollment_filters(class_name, name_prefix)
+        row = self.fetch_one(query + clause, tuple(params) if params else None)
+        return row[0] if row else 0
+
+    def get_enrollments_page(self, class_name, name_prefix, offset, limit):
+        clause, params = self._enrollment_filters(class_name, name_prefix)
+        page_query = f"""
+            SELECT e.StudentID, s.FullName, c.ClassName, e.EnrollmentDate, e.ClassID
+            FROM Enrollments e
+            JOIN Students s ON e.StudentID = s.StudentID
+            JOIN Classes c ON e.ClassID = c.ClassID
+            WHERE e.StudentID >= ? AND (e.StudentID > ? OR e.ClassID > ?){clause}
+            ORDER BY e.StudentID, e.ClassID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        key_query = f"""
+            SELECT e.StudentID, e.StudentID, e.ClassID
+            FROM Enrollments e
+            WHERE 1=1{clause}
+            ORDER BY e.StudentID, e.ClassID
+            OFFSET ? ROWS FETCH NEXT 1 ROWS ONLY
+        """
+        return self._keyset_page('enrollments', ('Enrollments', 'Students', 'Classes'), tuple(params), offset, limit,
+                                 page_query, key_query, (0, 0, 0), lambda row: (row[0], row[0], row[4]))
+
     def get_class_enrollments_by_name(self, class_name):
         if class_name == 'All Classes':
             return self.get_all_enrollments()
@@ -222,6 +692,20 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} enrollments for class {class_name}")
         return results
 
+    def get_class_enrollments_by_id(self, class_id):
+        print(f"Fetching enrollments for class ID: {class_id}")
+        query = """
+            SELECT e.StudentID, s.FullName, c.ClassName, e.EnrollmentDate, e.ClassID
+            FROM Enrollments e
+            JOIN Students s ON e.StudentID = s.StudentID
+            JOIN Classes c ON e.ClassID = c.ClassID
+            WHERE e.ClassID = ?
+            ORDER BY s.FullName
+        """
+        results = self.fetch_all(query, (class_id,))
+        print(f"Found {len(results) if results else 0} enrollments for class ID {class_id}")
+        return results
+
     def get_class_enrollments(self, class_id):
         print(f"Fetching enrollments for class ID: {class_id}")
         query = """
@@ -245,13 +729,61 @@ class DatabaseOperations:
         """
         return self.execute_query(query, (student_id, class_name))
 
+    def delete_enrollment_by_id(self, student_id, class_id):
+        print(f"Deleting enrollment for student {student_id} in class ID {class_id}")
+        query = "DELETE FROM Enrollments WHERE StudentID = ? AND ClassID = ?"
+        return self.execute_query(query, (student_id, class_id))
+
+    def move_enrollment(self, student_id, current_class_name, new_class_id):
+        with self.transaction() as transaction:
+            moved = self.delete_enrollment(student_id, current_class_name) and \
+                self.enroll_student_in_class(student_id, new_class_id)
+            if not moved:
+                transaction.mark_failed()
+        return moved and not transaction.failed
+
+    def move_enrollment_by_id(self, student_id, current_class_id, new_class_id):
+        with self.transaction() as transaction:
+            moved = self.delete_enrollment_by_id(student_id, current_class_id) and \
+                self.enroll_student_in_class(student_id, new_class_id)
+            if not moved:
+                transaction.mark_failed()
+        return moved and not transaction.failed
     
-    def add_grade(self, student_id, class_id, subject_id, grade):
+    def add_grade(self, student_id, class_id, subject_id, grade, recorded_at=None):
         query = """
-            INSERT INTO Grades (StudentID, SubjectID, ClassID, Grade) 
-            VALUES (?, ?, ?, ?)
+            INSERT INTO Grades (StudentID, SubjectID, ClassID, Grade, RecordedAt) 
+            VALUES (?, ?, ?, ?, ?)
+        """
+        recorded_at = recorded_at or self._now()
+        with self.transaction() as transaction:
+            added = self.execute_query(query, (student_id, subject_id, class_id, grade, recorded_at))
+            if added:
+                self._add_to_grade_aggregates(class_id, subject_id, grade)
+        return added and not transaction.failed
+
+    def add_grades_bulk(self, grades, chunk_size=None, recorded_at=None):
+        query = """
+            INSERT INTO Grades (StudentID, SubjectID, ClassID, Grade, RecordedAt) 
+            VALUES (?, ?, ?, ?, ?)
         """
-        return self.execute_query(query, (student_id, subject_id, class_id, grade))
+        recorded_at = recorded_at or self._now()
+        groups = set()
+
+        def rows():
+            for student_id, class_id, subject_id, grade in grades:
+                groups.add((class_id, subject_id))
+                yield (student_id, subject_id, class_id, grade, recorded_at)
+
+        result = self.execute_many(query, rows(), chunk_size)
+        if result.inserted:
+            with self.transaction():
+                self._recompute_grade_aggregates(groups)
+        return result
+
+    @staticmethod
+    def _now():
+        return datetime.now().replace(microsecond=0)
 
     def get_all_grades(self):
         print("Fetching all grades...")
@@ -267,6 +799,19 @@ class DatabaseOperations:
         print(f"Found {len(results) if results else 0} grades")
         return results
 
+    def iter_grades(self, page_size=None, batch_size=None):
+        query = """
+            SELECT g.GradeID, s.FullName, c.ClassName, sub.SubjectName, g.Grade
+            FROM Grades g
+            JOIN Students s ON g.StudentID = s.StudentID
+            JOIN Classes c ON g.ClassID = c.ClassID
+            JOIN Subjects sub ON g.SubjectID = sub.SubjectID
+            WHERE g.GradeID > ?
+            ORDER BY g.GradeID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        return self.iter_keyset(query, (0,), lambda row: (row[0],), page_size, batch_size)
+
     def get_grade(self, grade_id):
         query = """
             SELECT g.GradeID, s.FullName, c.ClassName, sub.SubjectName, g.Grade
@@ -278,6 +823,20 @@ class DatabaseOperations:
         """
         return self.fetch_one(query, (grade_id,))
 
+    def _grade_filters(self, class_filter, subject_filter):
+        clause = ""
+        params = []
+        
+        if class_filter and class_filter != 'All':
+            clause += " AND g.ClassID IN (SELECT ClassID FROM Classes WHERE ClassName = ?)"
+            params.append(class_filter)
+            
+        if subject_filter and subject_filter != 'All':
+            clause += " AND g.SubjectID IN (SELECT SubjectID FROM Subjects WHERE SubjectName = ?)"
+            params.append(subject_filter)
+            
+        return clause, params
+
     def get_filtered_grades(self, class_filter, subject_filter):
         print(f"Fetching grades with filters - Class: {class_filter}, Subject: {subject_filter}")
         base_query = """
@@ -288,16 +847,8 @@ class DatabaseOperations:
             INNER JOIN Subjects sub ON g.SubjectID = sub.SubjectID
             WHERE 1=1
         """
-        params = []
-        
-        if class_filter and class_filter != 'All':
-            base_query += " AND c.ClassName = ?"
-            params.append(class_filter)
-            
-        if subject_filter and subject_filter != 'All':
-            base_query += " AND sub.SubjectName = ?"
-            params.append(subject_filter)
-            
+        clause, params = self._grade_filters(class_filter, subject_filter)
+        base_query += clause
         base_query += " ORDER BY s.FullName, sub.SubjectName"
         
         try:
@@ -310,141 +861,542 @@ class DatabaseOperations:
             print(f"Error in get_filtered_grades: {str(e)}")
             return []
 
+    def count_filtered_grades(self, class_filter, subject_filter):
+        query = """
+            SELECT COUNT(*)
+            FROM Grades g
+            WHERE 1=1
+        """
+        clause, params = self._grade_filters(class_filter, subject_filter)
+        row = self.fetch_one(query + clause, tuple(params) if params else None)
+        return row[0] if row else 0
+
+    def get_filtered_grades_page(self, class_filter, subject_filter, offset, limit):
+        clause, params = self._grade_filters(class_filter, subject_filter)
+        page_query = f"""
+            SELECT g.GradeID, s.FullName, c.ClassName, sub.SubjectName, g.Grade
+            FROM Grades g
+            INNER JOIN Students s ON g.StudentID = s.StudentID
+            INNER JOIN Classes c ON g.ClassID = c.ClassID
+            INNER JOIN Subjects sub ON g.SubjectID = sub.SubjectID
+            WHERE g.GradeID > ?{clause}
+            ORDER BY g.GradeID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        key_query = f"""
+            SELECT g.GradeID
+            FROM Grades g
+            WHERE 1=1{clause}
+            ORDER BY g.GradeID
+            OFFSET ? ROWS FETCH NEXT 1 ROWS ONLY
+        """
+        return self._keyset_page('grades', ('Grades', 'Students', 'Classes', 'Subjects'), tuple(params), offset, limit,
+                                 page_query, key_query, (0,), lambda row: (row[0],))
+
     def update_grade(self, grade_id, new_grade):
         query = "UPDATE Grades SET Grade = ? WHERE GradeID = ?"
-        return self.execute_query(query, (new_grade, grade_id))
+        with self.transaction() as transaction:
+            old = self.fetch_one("SELECT ClassID, SubjectID, Grade FROM Grades WHERE GradeID = ?", (grade_id,))
+            updated = bool(old) and self.execute_query(query, (new_grade, grade_id))
+            if updated:
+                self._remove_from_grade_aggregates(old[0], old[1], old[2])
+                self._add_to_grade_aggregates(old[0], old[1], new_grade)
+                self._after_commit(transaction, lambda store: store.apply_update(grade_id, new_grade))
+            elif not old:
+                transaction.mark_failed()
+        return updated and not transaction.failed
 
     def delete_grade(self, grade_id):
         query = "DELETE FROM Grades WHERE GradeID = ?"
-        return self.execute_query(query, (grade_id,))
+        with self.transaction() as transaction:
+            old = self.fetch_one("SELECT ClassID, SubjectID, Grade FROM Grades WHERE GradeID = ?", (grade_id,))
+            deleted = bool(old) and self.execute_query(query, (grade_id,))
+            if deleted:
+                self._remove_from_grade_aggregates(old[0], old[1], old[2])
+                self._after_commit(transaction, lambda store: store.apply_delete(grade_id))
+            elif not old:
+                transaction.mark_failed()
+        return deleted and not transaction.failed
+
+    def _after_commit(self, transaction, apply):
+        # A joined transaction commits in the outer block, so the store is only patched once that really happens
+        def finish():
+            if transaction.committed and self.grade_store is not None:
+                apply(self.grade_store)
+        transaction.on_finish(finish)
+
+    @staticmethod
+    def _grade_band_deltas(grade, step):
+        grade = float(grade)
+        band = next((index for index, lower in enumerate(GRADE_BANDS) if grade >= lower), len(GRADE_BANDS))
+        return tuple(step if index == band else 0 for index in range(len(GRADE_BANDS) + 1))
+
+    def _add_to_grade_aggregates(self, class_id, subject_id, grade):
+        # The range lock is held until the grade's transaction ends, so two clients adding the first grade
+        # of a group take turns instead of the second failing on the primary key and losing its grade
+        ensure_query = """
+            INSERT INTO GradeAggregates (ClassID, SubjectID)
+            SELECT ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM GradeAggregates WITH (UPDLOCK, HOLDLOCK) WHERE ClassID = ? AND SubjectID = ?
+            )
+        """
+        update_query = """
+            UPDATE GradeAggregates
+            SET GradeSum = GradeSum + ?,
+                GradeCount = GradeCount + 1,
+                MinGrade = CASE WHEN MinGrade IS NULL OR ? < MinGrade THEN ? ELSE MinGrade END,
+                MaxGrade = CASE WHEN MaxGrade IS NULL OR ? > MaxGrade THEN ? ELSE MaxGrade END,
+                BandA = BandA + ?, BandB = BandB + ?, BandC = BandC + ?, BandD = BandD + ?, BandF = BandF + ?
+            WHERE ClassID = ? AND SubjectID = ?
+        """
+        self.execute_query(ensure_query, (class_id, subject_id, class_id, subject_id))
+        self.execute_query(update_query, (grade, grade, grade, grade, grade)
+                           + self._grade_band_deltas(grade, 1) + (class_id, subject_id))
+
+    def _remove_from_grade_aggregates(self, class_id, subject_id, grade):
+        update_query = """
+            UPDATE GradeAggregates
+            SET GradeSum = GradeSum - ?,
+                GradeCount = GradeCount - 1,
+                BandA = BandA + ?, BandB = BandB + ?, BandC = BandC + ?, BandD = BandD + ?, BandF = BandF + ?
+            WHERE ClassID = ? AND SubjectID = ?
+        """
+        # Only a removed extreme forces a rescan, and that stays within one (class, subject) group
+        bounds_query = """
+            UPDATE GradeAggregates
+            SET MinGrade = (SELECT MIN(Grade) FROM Grades WHERE ClassID = ? AND SubjectID = ?),
+                MaxGrade = (SELECT MAX(Grade) FROM Grades WHERE ClassID = ? AND SubjectID = ?)
+            WHERE ClassID = ? AND SubjectID = ? AND (MinGrade >= ? OR MaxGrade <= ?)
+        """
+        self.execute_query(update_query, (grade,) + self._grade_band_deltas(grade, -1) + (class_id, subject_id))
+        self.execute_query(bounds_query, (class_id, subject_id) * 3 + (grade, grade))
+
+    def _recompute_grade_aggregates(self, groups):
+        for class_id, subject_id in groups:
+            params = (class_id, subject_id)
+            self.execute_query("DELETE FROM GradeAggregates WHERE ClassID = ? AND SubjectID = ?", params)
+            self.execute_query(grade_aggregates_select("WHERE ClassID = ? AND SubjectID = ?"), params)
+
+    def rebuild_grade_aggregates(self):
+        print("Rebuilding grade aggregates...")
+        with self.transaction() as transaction:
+            rebuilt = self.execute_query("DELETE FROM GradeAggregates") and self.execute_query(grade_aggregates_select())
+        rebuilt = rebuilt and not transaction.failed
+        print("Grade aggregates rebuilt" if rebuilt else "Failed to rebuild grade aggregates")
+        return rebuilt
+
+    def enable_columnar_analytics(self, preload=True):
+        if self.grade_store is None:
+            # NumPy is only imported once something asks for columnar analytics
+            from grade_store import GradeStore
+            self.grade_store = GradeStore()
+        if preload:
+            self.refresh_grade_store()
+        return self.grade_store
+
+    def refresh_grade_store(self):
+        store = self.grade_store
+        if store is None:
+            return False
+        query = """
+            SELECT GradeID, StudentID, ClassID, SubjectID, Grade
+            FROM Grades
+            WHERE GradeID > ?
+            ORDER BY GradeID
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+        with self._grade_store_lock:
+            versions = self.get_table_versions(self.GRADE_STORE_TABLES)
+            if store.stale or versions != self._grade_store_versions or \
+               time.monotonic() - self._grade_store_loaded > self.GRADE_STORE_TTL:
+                store.load(self.iter_keyset(query, (0,), lambda row: (row[0],)))
+                self._grade_store_versions = versions
+                self._grade_store_loaded = time.monotonic()
+                print(f"Loaded {len(store)} grades into the columnar store")
+            else:
+                added = store.append(self.iter_keyset(query, (store.high_water,), lambda row: (row[0],)))
+                if added:
+                    print(f"Appended {added} new grades to the columnar store")
+        return True
+
+    def _columnar_averages(self, key, names):
+        self.refresh_grade_store()
+        stats = self._group_by_name(self.grade_store, key, names).group_by(key)
+        return sorted((names[int(group[0])], float(mean)) for group, mean in zip(stats.keys, stats.mean))
+
+    def _columnar_band_counts(self):
+        self.refresh_grade_store()
+        return self.grade_store.band_counts(GRADE_BANDS).tolist()
+
+    @staticmethod
+    def _group_by_name(store, key, names):
+        # IDs sharing a name become one group, the same way the SQL reports group by ClassName / SubjectName
+        first_ids = {}
+        for item_id, name in sorted(names.items()):
+            first_ids.setdefault(name, item_id)
+        return store.subset(key, names).relabel(key, {item_id: first_ids[name] for item_id, name in names.items()})
+
+    def _class_names(self):
+        return {row[0]: row[1] for row in self.get_all_classes()}
+
+    def _subject_names(self):
+        return {row[0]: row[1] for row in self.get_all_subjects()}
 
     
     def get_class_performance_report(self, class_name):
-        query = """
+        return self._class_performance_report("c.ClassName = ?", class_name, lambda: self._class_ids(class_name))
+
+    def get_class_performance_report_by_id(self, class_id):
+        return self._class_performance_report("a.ClassID = ?", class_id, lambda: [class_id])
+
+    def _class_performance_report(self, condition, param, class_ids):
+        query = f"""
             SELECT sub.SubjectName,
-                   AVG(g.Grade) as AvgGrade,
-                   MAX(g.Grade) as MaxGrade,
-                   MIN(g.Grade) as MinGrade,
-                   COUNT(DISTINCT g.StudentID) as StudentCount
-            FROM Grades g
-            JOIN Classes c ON g.ClassID = c.ClassID
-            JOIN Subjects sub ON g.SubjectID = sub.SubjectID
-            WHERE c.ClassName = ?
+                   SUM(a.GradeSum) * 1.0 / SUM(a.GradeCount) as AvgGrade,
+                   MAX(a.MaxGrade) as MaxGrade,
+                   MIN(a.MinGrade) as MinGrade,
+                   SUM(a.GradeCount) as GradeCount
+            FROM GradeAggregates a
+            JOIN Classes c ON a.ClassID = c.ClassID
+            JOIN Subjects sub ON a.SubjectID = sub.SubjectID
+            WHERE {condition} AND a.GradeCount > 0
             GROUP BY sub.SubjectName
             ORDER BY sub.SubjectName
         """
-        return self.fetch_all(query, (class_name,))
+        if self.grade_store is not None:
+            return [row[:5] for row in self.get_class_grade_statistics_by_ids(class_ids())]
+        return self.fetch_all(query, (param,))
+
+    def get_class_grade_statistics(self, class_name):
+        return self.get_class_grade_statistics_by_ids(self._class_ids(class_name))
+
+    def get_class_grade_statistics_by_id(self, class_id):
+        return self.get_class_grade_statistics_by_ids([class_id])
+
+    def get_class_grade_statistics_by_ids(self, class_ids):
+        class_ids = list(class_ids)
+        if not class_ids:
+            return []
+        if self.grade_store is not None:
+            self.refresh_grade_store()
+            store = self.grade_store.subset('class_id', class_ids)
+        else:
+            query = f"""
+                SELECT GradeID, StudentID, ClassID, SubjectID, Grade
+                FROM Grades
+                WHERE ClassID IN ({', '.join('?' * len(class_ids))})
+            """
+            from grade_store import GradeStore
+            store = GradeStore()
+            store.load(self.fetch_all(query, tuple(class_ids)) or [])
+
+        subject_names = self._subject_names()
+        store = self._group_by_name(store, 'subject_id', subject_names)
+        stats = store.group_by('subject_id')
+        _, quantiles = store.percentiles(self.REPORT_QUANTILES, 'subject_id')
+        rows = []
+        for index, (subject_id,) in enumerate(stats.keys):
+            median, p10, p90 = quantiles[index]
+            rows.append((
+                subject_names[int(subject_id)],
+                float(stats.mean[index]),
+                float(stats.maximum[index]),
+                float(stats.minimum[index]),
+                int(stats.count[index]),
+                float(median),
+                float(p10),
+                float(p90),
+                float(stats.stddev[index])
+            ))
+        return sorted(rows)
+
+    def _class_ids(self, class_name):
+        return [class_id for class_id, name in self._class_names().items() if name == class_name]
+
+    def get_student_grade_ranks(self, student_name):
+        return self._student_grade_ranks("s.FullName = ?", student_name)
+
+    def get_student_grade_ranks_by_id(self, student_id):
+        return self._student_grade_ranks("s.StudentID = ?", student_id)
+
+    def _student_grade_ranks(self, condition, param):
+        query = f"""
+            WITH Cohorts AS (
+                SELECT DISTINCT g.ClassID, g.SubjectID
+                FROM Grades g
+                JOIN Students s ON g.StudentID = s.StudentID
+                WHERE {condition}
+            ),
+            Ranked AS (
+                SELECT g.StudentID, g.ClassID, g.SubjectID, g.Grade, g.RecordedAt,
+                       RANK() OVER (PARTITION BY g.ClassID, g.SubjectID ORDER BY g.Grade DESC) as GradeRank,
+                       COUNT(*) OVER (PARTITION BY g.ClassID, g.SubjectID) as CohortSize
+                FROM Grades g
+                JOIN Cohorts co ON g.ClassID = co.ClassID AND g.SubjectID = co.SubjectID
+            )
+            SELECT sub.SubjectName, r.Grade, c.ClassName, r.RecordedAt as GradeDate, r.GradeRank, r.CohortSize
+            FROM Ranked r
+            JOIN Students s ON r.StudentID = s.StudentID
+            JOIN Classes c ON r.ClassID = c.ClassID
+            JOIN Subjects sub ON r.SubjectID = sub.SubjectID
+            WHERE {condition}
+            ORDER BY sub.SubjectName
+        """
+        return self.fetch_all(query, (param, param))
+
+    def get_grade_trends(self, period='month', group_by='class', start=None, end=None, name=None):
+        if period not in self.TREND_PERIODS or group_by not in self.TREND_GROUPS:
+            print(f"Unsupported grade trend: {period} by {group_by}")
+            return []
+        label_column, join = self.TREND_GROUPS[group_by]
+        bucket = self.db.backend.date_bucket_sql(period, 'g.RecordedAt')
+
+        conditions = []
+        params = []
+        if start:
+            conditions.append("g.RecordedAt >= ?")
+            params.append(start)
+        if end:
+            conditions.append("g.RecordedAt < ?")
+            params.append(end)
+        if name:
+            conditions.append(f"{label_column} = ?")
+            params.append(name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        query = f"""
+            SELECT {bucket} as Period, {label_column} as Label,
+                   AVG(g.Grade * 1.0) as AvgGrade, COUNT(*) as GradeCount
+            FROM Grades g
+            {join}
+            {where}
+            GROUP BY {bucket}, {label_column}
+            ORDER BY Period, Label
+        """
+        rows = self.fetch_all(query, tuple(params))
+        return [(self._as_date(row[0]), row[1], float(row[2]), int(row[3])) for row in rows or []]
+
+    @staticmethod
+    def _as_date(value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, str):
+            return date.fromisoformat(value[:10])
+        return value
+
+    # Enrollments and subjects are counted per class before they meet, so the joins never multiply rows
+    CLASS_LOAD_CTES = """
+        WITH ClassStudents AS (
+            SELECT ClassID, COUNT(*) as StudentCount
+            FROM Enrollments
+            GROUP BY ClassID
+        ),
+        ClassSubjectLists AS (
+            SELECT cs.ClassID, COUNT(*) as SubjectCount,
+                   STRING_AGG(CONVERT(NVARCHAR(MAX), s.SubjectName), ', ') WITHIN GROUP (ORDER BY s.SubjectName) as Subjects
+            FROM ClassSubjects cs
+            JOIN Subjects s ON cs.SubjectID = s.SubjectID
+            GROUP BY cs.ClassID
+        )
+    """
 
     def get_teacher_load_report(self, teacher_name):
-        query = """
+        return self._teacher_load_report("t.FullName = ?", teacher_name)
+
+    def get_teacher_load_report_by_id(self, teacher_id):
+        return self._teacher_load_report("c.TeacherID = ?", teacher_id)
+
+    def _teacher_load_report(self, condition, param):
+        query = self.CLASS_LOAD_CTES + f"""
             SELECT c.ClassName,
-                   COUNT(DISTINCT e.StudentID) as StudentCount,
-                   STRING_AGG(CONVERT(NVARCHAR(MAX), s.SubjectName), ', ') as Subjects,
-                   COUNT(DISTINCT s.SubjectID) * 3 as TotalHours
+                   ISNULL(cst.StudentCount, 0) as StudentCount,
+                   ISNULL(csl.Subjects, '') as Subjects,
+                   ISNULL(csl.SubjectCount, 0) * {self.HOURS_PER_SUBJECT} as TotalHours
             FROM Classes c
             JOIN Teachers t ON c.TeacherID = t.TeacherID
-            LEFT JOIN Enrollments e ON c.ClassID = e.ClassID
-            LEFT JOIN ClassSubjects cs ON c.ClassID = cs.ClassID
-            LEFT JOIN Subjects s ON cs.SubjectID = s.SubjectID
-            WHERE t.FullName = ?
-            GROUP BY c.ClassName
+            LEFT JOIN ClassStudents cst ON c.ClassID = cst.ClassID
+            LEFT JOIN ClassSubjectLists csl ON c.ClassID = csl.ClassID
+            WHERE {condition}
             ORDER BY c.ClassName
         """
-        return self.fetch_all(query, (teacher_name,))
+        return self.fetch_all(query, (param,))
+
+    def get_all_teacher_loads(self):
+        query = self.CLASS_LOAD_CTES + f"""
+            , TeacherTotals AS (
+                SELECT c.TeacherID,
+                       COUNT(*) as ClassCount,
+                       SUM(ISNULL(cst.StudentCount, 0)) as StudentCount,
+                       SUM(ISNULL(csl.SubjectCount, 0)) as SubjectCount
+                FROM Classes c
+                LEFT JOIN ClassStudents cst ON c.ClassID = cst.ClassID
+                LEFT JOIN ClassSubjectLists csl ON c.ClassID = csl.ClassID
+                GROUP BY c.TeacherID
+            ),
+            TeacherSubjects AS (
+                SELECT ts.TeacherID,
+                       STRING_AGG(CONVERT(NVARCHAR(MAX), s.SubjectName), ', ') WITHIN GROUP (ORDER BY s.SubjectName) as Subjects
+                FROM (
+                    SELECT DISTINCT c.TeacherID, cs.SubjectID
+                    FROM Classes c
+                    JOIN ClassSubjects cs ON c.ClassID = cs.ClassID
+                ) ts
+                JOIN Subjects s ON ts.SubjectID = s.SubjectID
+                GROUP BY ts.TeacherID
+            )
+            SELECT t.TeacherID, t.FullName,
+                   ISNULL(tt.ClassCount, 0) as ClassCount,
+                   ISNULL(tt.StudentCount, 0) as StudentCount,
+                   ISNULL(tsub.Subjects, '') as Subjects,
+                   ISNULL(tt.SubjectCount, 0) * {self.HOURS_PER_SUBJECT} as TotalHours
+            FROM Teachers t
+            LEFT JOIN TeacherTotals tt ON t.TeacherID = tt.TeacherID
+            LEFT JOIN TeacherSubjects tsub ON t.TeacherID = tsub.TeacherID
+            ORDER BY t.FullName
+        """
+        return self.fetch_all(query)
 
     def get_student_grades(self, student_name):
         print(f"Fetching grades for student: {student_name}")
+        return self._student_grades("s.FullName = ?", student_name)
+
+    def get_student_grades_by_id(self, student_id):
+        print(f"Fetching grades for student ID: {student_id}")
+        return self._student_grades("g.StudentID = ?", student_id)
+
+    def _student_grades(self, condition, param):
         try:
-            
-            query = """
-                SELECT sub.SubjectName, g.Grade, c.ClassName, NULL as GradeDate
+            query = f"""
+                SELECT sub.SubjectName, g.Grade, c.ClassName, g.RecordedAt as GradeDate
                 FROM Grades g
                 JOIN Students s ON g.StudentID = s.StudentID
                 JOIN Classes c ON g.ClassID = c.ClassID
                 JOIN Subjects sub ON g.SubjectID = sub.SubjectID
-                WHERE s.FullName = ?
+                WHERE {condition}
                 ORDER BY sub.SubjectName
             """
-            results = self.fetch_all(query, (student_name,))
-            print(f"Found {len(results) if results else 0} grades for student {student_name}")
+            results = self.fetch_all(query, (param,))
+            print(f"Found {len(results) if results else 0} grades for student {param}")
             return results
         except Exception as e:
             print(f"Error in get_student_grades: {str(e)}")
             return []
             
     
+    CLASS_AVERAGES_QUERY = """
+        SELECT c.ClassName, SUM(a.GradeSum) * 1.0 / SUM(a.GradeCount) as AvgGrade
+        FROM GradeAggregates a
+        JOIN Classes c ON a.ClassID = c.ClassID
+        WHERE a.GradeCount > 0
+        GROUP BY c.ClassName
+        ORDER BY c.ClassName
+    """
+
+    SUBJECT_AVERAGES_QUERY = """
+        SELECT sub.SubjectName, SUM(a.GradeSum) * 1.0 / SUM(a.GradeCount) as AvgGrade
+        FROM GradeAggregates a
+        JOIN Subjects sub ON a.SubjectID = sub.SubjectID
+        WHERE a.GradeCount > 0
+        GROUP BY sub.SubjectName
+        ORDER BY sub.SubjectName
+    """
+
+    GENDER_DISTRIBUTION_QUERY = """
+        SELECT Gender, COUNT(*) as Count
+        FROM Students
+        GROUP BY Gender
+    """
+
+    ENROLLMENT_COUNTS_QUERY = """
+        SELECT c.ClassName, COUNT(e.StudentID) as StudentCount
+        FROM Classes c
+        LEFT JOIN Enrollments e ON c.ClassID = e.ClassID
+        GROUP BY c.ClassName
+        ORDER BY c.ClassName
+    """
+
+    GRADE_BANDS_QUERY = """
+        SELECT SUM(BandA), SUM(BandB), SUM(BandC), SUM(BandD), SUM(BandF)
+        FROM GradeAggregates
+    """
+
     def get_class_average_grades(self):
-        query = """
-            SELECT c.ClassName, AVG(g.Grade) as AvgGrade
-            FROM Grades g
-            JOIN Classes c ON g.ClassID = c.ClassID
-            GROUP BY c.ClassName
-            ORDER BY c.ClassName
-        """
-        return self.fetch_all(query)
+        if self.grade_store is not None:
+            return self._columnar_averages('class_id', self._class_names())
+        return self.fetch_all(self.CLASS_AVERAGES_QUERY)
     
     def get_subject_average_grades(self):
-        query = """
-            SELECT sub.SubjectName, AVG(g.Grade) as AvgGrade
-            FROM Grades g
-            JOIN Subjects sub ON g.SubjectID = sub.SubjectID
-            GROUP BY sub.SubjectName
-            ORDER BY sub.SubjectName
-        """
-        return self.fetch_all(query)
+        if self.grade_store is not None:
+            return self._columnar_averages('subject_id', self._subject_names())
+        return self.fetch_all(self.SUBJECT_AVERAGES_QUERY)
     
     def get_gender_distribution(self):
-        query = """
-            SELECT Gender, COUNT(*) as Count
-            FROM Students
-            GROUP BY Gender
-        """
-        return self.fetch_all(query)
+        return self.fetch_all(self.GENDER_DISTRIBUTION_QUERY)
     
     def get_class_enrollment_counts(self):
-        query = """
-            SELECT c.ClassName, COUNT(e.StudentID) as StudentCount
-            FROM Classes c
-            LEFT JOIN Enrollments e ON c.ClassID = e.ClassID
-            GROUP BY c.ClassName
-            ORDER BY c.ClassName
-        """
-        return self.fetch_all(query)
+        return self.fetch_all(self.ENROLLMENT_COUNTS_QUERY)
     
     def get_grade_distribution(self):
         try:
             print("Fetching grade distribution data...")
-            query = """
-                SELECT 
-                    CASE
-                        WHEN Grade >= 90 THEN 'A (90-100)'
-                        WHEN Grade >= 80 THEN 'B (80-89)'
-                        WHEN Grade >= 70 THEN 'C (70-79)'
-                        WHEN Grade >= 60 THEN 'D (60-69)'
-                        ELSE 'F (Below 60)'
-                    END as GradeRange,
-                    COUNT(*) as Count
-                FROM Grades
-                GROUP BY 
-                    CASE
-                        WHEN Grade >= 90 THEN 'A (90-100)'
-                        WHEN Grade >= 80 THEN 'B (80-89)'
-                        WHEN Grade >= 70 THEN 'C (70-79)'
-                        WHEN Grade >= 60 THEN 'D (60-69)'
-                        ELSE 'F (Below 60)'
-                    END
-                ORDER BY 
-                    CASE GradeRange
-                        WHEN 'A (90-100)' THEN 1
-                        WHEN 'B (80-89)' THEN 2
-                        WHEN 'C (70-79)' THEN 3
-                        WHEN 'D (60-69)' THEN 4
-                        WHEN 'F (Below 60)' THEN 5
-                    END
-            """
-            result = self.fetch_all(query)
-            print(f"Found {len(result) if result else 0} grade distribution records")
+            if self.grade_store is not None:
+                result = self._label_grade_bands(self._columnar_band_counts())
+            else:
+                result = self._label_grade_bands(self.fetch_one(self.GRADE_BANDS_QUERY))
+            print(f"Found {len(result)} grade distribution records")
             return result
         except Exception as e:
             print(f"Error in get_grade_distribution: {str(e)}")
             return []
+
+    def _label_grade_bands(self, totals):
+        return [(label, int(count)) for label, count in zip(self.GRADE_BAND_LABELS, totals or ()) if count]
+
+    def get_dashboard_snapshot(self):
+        queries = [
+            ('gender_distribution', self.GENDER_DISTRIBUTION_QUERY),
+            ('enrollment_counts', self.ENROLLMENT_COUNTS_QUERY),
+        ]
+        if self.grade_store is None:
+            queries += [
+                ('class_averages', self.CLASS_AVERAGES_QUERY),
+                ('subject_averages', self.SUBJECT_AVERAGES_QUERY),
+                ('grade_distribution', self.GRADE_BANDS_QUERY),
+            ]
+        with self.db.borrow() as connection:
+            if not connection:
+                return None
+            try:
+                cursor = connection.cursor()
+                try:
+                    result_sets = []
+                    if self.db.backend.supports_batches:
+                        batch = "SET NOCOUNT ON;\n" + ";\n".join(self.db.translate(query) for _, query in queries)
+                        cursor.execute(batch)
+                        result_sets.append(cursor.fetchall())
+                        while cursor.nextset():
+                            result_sets.append(cursor.fetchall())
+                    else:
+                        for _, query in queries:
+                            cursor.execute(self.db.translate(query))
+                            result_sets.append(cursor.fetchall())
+                finally:
+                    cursor.close()
+            except Exception as e:
+                print(f"Error fetching dashboard data: {str(e)}")
+                return None
+
+        if len(result_sets) != len(queries):
+            print(f"Expected {len(queries)} dashboard result sets, got {len(result_sets)}")
+            return None
+
+        datasets = {name: tuple(tuple(row) for row in rows) for (name, _), rows in zip(queries, result_sets)}
+        if self.grade_store is None:
+            grade_bands = datasets['grade_distribution'][0] if datasets['grade_distribution'] else None
+        else:
+            datasets['class_averages'] = tuple(self._columnar_averages('class_id', self._class_names()))
+            datasets['subject_averages'] = tuple(self._columnar_averages('subject_id', self._subject_names()))
+            grade_bands = self._columnar_band_counts()
+        datasets['grade_distribution'] = tuple(self._label_grade_bands(grade_bands))
+        return DashboardSnapshot(**datasets)
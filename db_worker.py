@@ -0,0 +1,103 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class DbWorker:
+    def __init__(self, root, max_workers=4, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+
+        self._results = queue.Queue()
+        self._latest = {}
+        self._pending = 0
+        self._generation = 0
+        self._poll_job = None
+        self._busy_listeners = []
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def add_busy_listener(self, callback):
+        self._busy_listeners.append(callback)
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, **kwargs):
+        if key is not None:
+            self.cancel(key)
+        future = self.executor.submit(fn, *args, **kwargs)
+        return self.track(future, on_success, on_error, key)
+
+    def track(self, future, on_success=None, on_error=None, key=None):
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None and previous is not future:
+                previous.cancel()
+            self._latest[key] = future
+
+        generation = self._generation
+        self._pending += 1
+        future.add_done_callback(lambda f: self._results.put((f, on_success, on_error, key, generation)))
+        self._notify()
+        self._schedule_poll()
+        return future
+
+    def cancel(self, key):
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def cancel_all(self):
+        self._generation += 1
+        for future in self._latest.values():
+            future.cancel()
+        self._latest.clear()
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._poll_job:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                future, on_success, on_error, key, generation = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending -= 1
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue
+                del self._latest[key]
+            if generation != self._generation or future.cancelled():
+                continue
+
+            try:
+                error = future.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        print(f"Background database call failed: {str(error)}")
+                elif on_success:
+                    on_success(future.result())
+            except Exception as e:
+                print(f"Error delivering background result: {str(e)}")
+
+        self._notify()
+        if self._pending > 0:
+            self._schedule_poll()
+
+    def _notify(self):
+        for callback in self._busy_listeners:
+            try:
+                callback(self._pending)
+            except Exception as e:
+                print(f"Error updating loading state: {str(e)}")
@@ -0,0 +1,90 @@
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib._pylab_helpers import Gcf
+
+class FigureManager:
+    def __init__(self):
+        self._figures = {}
+        self._artists = {}
+        self._canvases = {}
+
+        self._created = 0
+        self._reused = 0
+        self._released = 0
+
+    def figure(self, key, figsize):
+        figure = self._figures.get(key)
+        if figure is None:
+            figure = Figure(figsize=figsize)
+            self._figures[key] = figure
+            self._artists[key] = {}
+            self._created += 1
+        else:
+            self._reused += 1
+        return figure, self._artists[key]
+
+    def reset(self, key):
+        figure = self._figures[key]
+        figure.clear()
+        artists = self._artists[key]
+        artists.clear()
+        return figure.add_subplot(), artists
+
+    def show(self, key, master, **pack_options):
+        canvas = self._canvases.get(key)
+        if canvas is not None and self._attached(canvas, master):
+            canvas.draw()
+            return canvas
+        if canvas is not None:
+            self._release_canvas(canvas)
+        canvas = FigureCanvasTkAgg(self._figures[key], master=master)
+        canvas.draw()
+        canvas.get_tk_widget().pack(**pack_options)
+        self._canvases[key] = canvas
+        return canvas
+
+    def release(self):
+        for canvas in self._canvases.values():
+            self._release_canvas(canvas)
+        self._canvases.clear()
+
+    @staticmethod
+    def _attached(canvas, master):
+        widget = canvas.get_tk_widget()
+        try:
+            return widget.master is master and bool(widget.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def _release_canvas(self, canvas):
+        try:
+            canvas.get_tk_widget().destroy()
+        except tk.TclError:
+            pass
+        # Detach the Tk canvas so its photo buffer can be freed while the figure stays cached
+        FigureCanvasBase(canvas.figure)
+        self._released += 1
+
+    def close(self, key=None):
+        self.release()
+        keys = [key] if key is not None else list(self._figures)
+        for name in keys:
+            figure = self._figures.pop(name, None)
+            if figure is not None:
+                figure.clear()
+            self._artists.pop(name, None)
+
+    def stats(self):
+        raster_bytes = sum(int(figure.bbox.width) * int(figure.bbox.height) * 4
+                           for figure in self._figures.values())
+        return {
+            'live_figures': len(self._figures),
+            'attached_canvases': len(self._canvases),
+            'created': self._created,
+            'reused': self._reused,
+            'released': self._released,
+            'raster_bytes': raster_bytes,
+            'pyplot_figures': len(Gcf.figs),
+        }
@@ -0,0 +1,152 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+GroupStats = namedtuple('GroupStats', ['keys', 'count', 'total', 'mean', 'minimum', 'maximum', 'stddev'])
+
+COLUMNS = ('grade_id', 'student_id', 'class_id', 'subject_id', 'grade')
+DTYPES = (np.int64, np.int64, np.int64, np.int64, np.float64)
+
+class GradeStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in zip(COLUMNS, DTYPES)}
+        self.high_water = 0
+        self.stale = True
+
+    def __len__(self):
+        return len(self._columns['grade_id'])
+
+    def load(self, rows):
+        columns = self._to_columns(rows)
+        order = np.argsort(columns['grade_id'], kind='stable')
+        with self._lock:
+            self._columns = {name: values[order] for name, values in columns.items()}
+            self.high_water = int(self._columns['grade_id'][-1]) if len(order) else 0
+            self.stale = False
+
+    def append(self, rows):
+        columns = self._to_columns(rows)
+        if not len(columns['grade_id']):
+            return 0
+        order = np.argsort(columns['grade_id'], kind='stable')
+        with self._lock:
+            self._columns = {name: np.concatenate((self._columns[name], values[order]))
+                             for name, values in columns.items()}
+            self.high_water = max(self.high_water, int(columns['grade_id'].max()))
+        return len(order)
+
+    def apply_update(self, grade_id, grade):
+        with self._lock:
+            index = self._find(grade_id)
+            if index is not None:
+                self._columns['grade'][index] = float(grade)
+            return index is not None
+
+    def apply_delete(self, grade_id):
+        with self._lock:
+            index = self._find(grade_id)
+            if index is not None:
+                self._columns = {name: np.delete(values, index) for name, values in self._columns.items()}
+            return index is not None
+
+    def invalidate(self):
+        self.stale = True
+
+    def subset(self, name, values):
+        store = GradeStore()
+        with self._lock:
+            mask = np.isin(self._columns[name], np.asarray(list(values), dtype=np.int64))
+            store._columns = {column: data[mask] for column, data in self._columns.items()}
+            store.high_water = self.high_water
+            store.stale = self.stale
+        return store
+
+    def relabel(self, name, mapping):
+        store = GradeStore()
+        with self._lock:
+            store._columns = dict(self._columns)
+            store.high_water = self.high_water
+            store.stale = self.stale
+        values = store._columns[name]
+        if mapping and len(values):
+            keys = np.fromiter(mapping, dtype=np.int64, count=len(mapping))
+            targets = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))
+            order = np.argsort(keys)
+            keys, targets = keys[order], targets[order]
+            index = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+            # Values missing from the mapping keep their own label
+            store._columns[name] = np.where(keys[index] == values, targets[index], values)
+        return store
+
+    def column(self, name):
+        with self._lock:
+            return self._columns[name]
+
+    def group_by(self, *keys):
+        key_columns, grades = self._snapshot(keys)
+        if not len(grades):
+            empty = np.empty(0)
+            return GroupStats(np.empty((0, len(keys)), dtype=np.int64), empty, empty, empty, empty, empty, empty)
+
+        group_keys, sorted_grades, starts, ends = self._sorted_groups(key_columns, grades)
+        count = ends - starts
+        total = np.add.reduceat(sorted_grades, starts)
+        mean = total / count
+        # Population standard deviation, from squared deviations around each group's mean
+        deviations = np.add.reduceat((sorted_grades - np.repeat(mean, count)) ** 2, starts)
+        return GroupStats(group_keys, count, total, mean, sorted_grades[starts], sorted_grades[ends - 1],
+                          np.sqrt(deviations / count))
+
+    def percentiles(self, quantiles, *keys):
+        key_columns, grades = self._snapshot(keys)
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if not len(grades):
+            return np.empty((0, len(keys)), dtype=np.int64), np.empty((0, len(quantiles)))
+
+        group_keys, sorted_grades, starts, ends = self._sorted_groups(key_columns, grades)
+
+        # Linear interpolation between closest ranks, matching numpy's default percentile method
+        positions = starts[:, None] + quantiles[None, :] * (ends - starts - 1)[:, None]
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        fraction = positions - lower
+        values = sorted_grades[lower] * (1 - fraction) + sorted_grades[upper] * fraction
+        return group_keys, values
+
+    def band_counts(self, lower_bounds):
+        grades = self.column('grade')
+        bounds = np.sort(np.asarray(lower_bounds, dtype=np.float64))
+        bands = np.digitize(grades, bounds)
+        # digitize numbers bands from the lowest bound up; flip so index 0 is the top band
+        return np.bincount(len(bounds) - bands, minlength=len(bounds) + 1)
+
+    def _snapshot(self, keys):
+        with self._lock:
+            return [self._columns[key] for key in keys], self._columns['grade']
+
+    def _sorted_groups(self, key_columns, grades):
+        order = np.lexsort((grades,) + tuple(reversed(key_columns)))
+        sorted_grades = grades[order]
+        sorted_keys = np.stack([column[order] for column in key_columns], axis=1) if key_columns \
+            else np.empty((len(grades), 0), dtype=np.int64)
+        changes = np.flatnonzero(np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)) + 1
+        starts = np.concatenate(([0], changes))
+        ends = np.concatenate((changes, [len(grades)]))
+        return sorted_keys[starts], sorted_grades, starts, ends
+
+    def _find(self, grade_id):
+        grade_ids = self._columns['grade_id']
+        index = int(np.searchsorted(grade_ids, grade_id))
+        if index < len(grade_ids) and grade_ids[index] == grade_id:
+            return index
+        return None
+
+    @staticmethod
+    def _to_columns(rows):
+        rows = list(rows)
+        columns = {}
+        for position, (name, dtype) in enumerate(zip(COLUMNS, DTYPES)):
+            columns[name] = np.fromiter((row[position] for row in rows), dtype=dtype, count=len(rows))
+        return columns
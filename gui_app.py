@@ -1,15 +1,25 @@
+import time
+STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
 from database_operations import DatabaseOperations
 from database_connection import DatabaseConnection
+from virtual_table import VirtualTable
+from keyed_table import KeyedTableModel
+from chunked_loader import ChunkedLoader
+from screen_manager import ScreenManager
+from db_worker import DbWorker
 import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+from chart_rendering import ChartRenderer, png_to_photo_data
+from startup_timing import StartupTimer
+from typeahead_combobox import TypeaheadCombobox, PrefixIndex
 
 class SchoolManagementGUI:
     def __init__(self):
+        self.startup = StartupTimer(STARTED)
+        self.startup.mark('imports')
         self.root = ThemedTk(theme="arc")
         self.root.title("School Management System")
         self.root.geometry("1200x800")
@@ -19,7 +29,22 @@ class SchoolManagementGUI:
         style = ttk.Style()
         style.configure('Action.TButton', padding=5)
         
-        self.db_ops = DatabaseOperations()
+        self._debounce_jobs = {}
+        self._pending_queries = 0
+        self._row_progress = (0, 0)
+        self.worker = DbWorker(self.root)
+        self.loader = ChunkedLoader(self.root)
+        # matplotlib is only imported when the Graphs screen is first opened
+        self.figures = None
+        self.charts = ChartRenderer()
+        self.worker.add_busy_listener(self.show_loading_state)
+        self.loader.add_progress_listener(self.show_row_progress)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Connect in the background so the window paints first; early queries wait for the connection
+        self.db_ops = DatabaseOperations(connect=False)
+        self.worker.submit(self.connect_database, on_success=self.on_database_connected,
+                           on_error=lambda error: self.on_database_connected(False))
         
         self.main_content = ttk.Frame(self.root, padding="10")
         self.main_content.pack(fill=tk.BOTH, expand=True)
@@ -28,9 +53,24 @@ class SchoolManagementGUI:
         
         self.content_frame = ttk.Frame(self.main_content)
         self.content_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.screens = ScreenManager(self.content_frame, self.db_ops.get_table_versions)
         
         print("GUI initialized, showing students section...")
         self.show_students()
+        self.startup.mark('window')
+
+    def connect_database(self):
+        connected = self.db_ops.connect()
+        if connected:
+            self.startup.mark('connect')
+            # Grades are loaded into the columnar store by the first report or graph that needs them
+            self.db_ops.enable_columnar_analytics(preload=False)
+        return connected
+
+    def on_database_connected(self, connected):
+        if not connected:
+            self.startup.report()
+            messagebox.showerror("Error", "Could not connect to the database")
 
     def create_navigation(self):
         nav_frame = ttk.LabelFrame(self.main_content, text="Navigation", padding="10")
@@ -46,11 +86,94 @@ class SchoolManagementGUI:
         ttk.Button(nav_frame, text="Grades", command=self.show_grades, **button_style).pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text="Reports", command=self.show_reports, **button_style).pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text="Graphs", command=self.show_graphs, **button_style).pack(side=tk.LEFT, padx=5)
+        
+        self.status_label = ttk.Label(nav_frame, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
+    def show_loading_state(self, pending):
+        self._pending_queries = pending
+        self.update_status()
+
+    def show_row_progress(self, done, total):
+        self._row_progress = (done, total)
+        self.update_status()
+
+    def update_status(self):
+        if not hasattr(self, 'status_label'):
+            return
+        done, total = self._row_progress
+        if self._pending_queries:
+            self.status_label.config(text=f"Loading... ({self._pending_queries})")
+            self.root.config(cursor="watch")
+        elif done < total:
+            # Rows are still being added in slices, but the window stays usable meanwhile
+            self.status_label.config(text=f"Showing {done:,} of {total:,} rows")
+            self.root.config(cursor="")
+        else:
+            self.status_label.config(text="")
+            self.root.config(cursor="")
+
+    def on_close(self):
+        self.loader.shutdown()
+        self.worker.shutdown()
+        if self.figures is not None:
+            self.figures.close()
+        self.charts.shutdown()
+        self.root.destroy()
+
+    def debounce(self, key, callback, delay=300):
+        pending = self._debounce_jobs.pop(key, None)
+        if pending:
+            self.root.after_cancel(pending)
+        
+        def run():
+            self._debounce_jobs.pop(key, None)
+            callback()
+        
+        self._debounce_jobs[key] = self.root.after(delay, run)
+    
+    def typeahead(self, parent, source, **kwargs):
+        # Matches come from an indexed prefix query on the worker thread instead of a full table load
+        return TypeaheadCombobox(parent, lambda prefix, limit: self.db_ops.lookup_names(source, prefix, limit),
+                                 worker=self.worker, **kwargs)
+
+    def run_db(self, fn, *args, on_done, button=None):
+        # Dialog lookups and writes go through the worker like the list screens, so a slow server never freezes the window
+        if button is not None:
+            button.config(state=tk.DISABLED)
+        
+        def release_button():
+            if button is not None and button.winfo_exists():
+                button.config(state=tk.NORMAL)
+        
+        def finish(result):
+            release_button()
+            on_done(result)
+        
+        def fail(error):
+            release_button()
+            print(f"Database error: {str(error)}")
+            messagebox.showerror("Error", f"Database error: {str(error)}")
+        
+        self.worker.submit(fn, *args, on_success=finish, on_error=fail)
 
-    def clear_main_content(self):
-        print("Clearing main content...")
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+    def set_values(self, combo, values):
+        # Results can land after the dialog or screen holding the combo was closed
+        if combo.winfo_exists():
+            combo.configure(values=values)
+
+    def run_db_write(self, fn, *args, success, failure, close=None, refresh=None, button=None):
+        def finish(result):
+            if not result:
+                messagebox.showerror("Error", failure)
+                return
+            messagebox.showinfo("Success", success)
+            if close is not None and close.winfo_exists():
+                close.destroy()
+            if refresh is not None:
+                refresh()
+        
+        self.run_db(fn, *args, on_done=finish, button=button)
 
     def create_table(self, columns, show="headings"):
         tree = ttk.Treeview(self.content_frame, columns=columns, show=show)
@@ -102,9 +225,10 @@ class SchoolManagementGUI:
         delete_command(tree)
 
     def show_students(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('students', self.build_students_screen, ('Students',))
+
+    def build_students_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Students Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT, padx=5)
@@ -124,7 +248,7 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_student(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        search_frame = ttk.LabelFrame(self.content_frame, text="Search", padding="5")
+        search_frame = ttk.LabelFrame(frame, text="Search", padding="5")
         search_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(search_frame, text="Search by name:").pack(side=tk.LEFT, padx=5)
@@ -132,13 +256,25 @@ class SchoolManagementGUI:
         search_entry = ttk.Entry(search_frame, textvariable=search_var, width=40)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         table_frame.columnconfigure(0, weight=1)
         table_frame.rowconfigure(0, weight=1)
         
+        def format_student(student):
+            return (
+                student[0],
+                student[1],
+                student[2].strftime('%Y-%m-%d') if student[2] else '',
+                student[3],
+                student[4] or '',
+                student[5] or '',
+                student[6] or ''
+            )
+        
         columns = ("ID", "Name", "DOB", "Gender", "Email", "Phone", "Address")
-        tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        table = VirtualTable(table_frame, columns, formatter=format_student, worker=self.worker)
+        tree = table.tree
         
         col_widths = {
             "ID": 50,
@@ -154,43 +290,20 @@ class SchoolManagementGUI:
             tree.heading(col, text=col.title())
             tree.column(col, width=col_widths.get(col, 120), minwidth=50)
         
-        y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-        x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        
-        tree.grid(row=0, column=0, sticky="nsew")
-        y_scroll.grid(row=0, column=1, sticky="ns")
-        x_scroll.grid(row=1, column=0, sticky="ew")
+        # Counting students is the first query the opening screen runs, even when the table is empty
+        count_students = self.startup.timed('first query', self.db_ops.count_students)
         
         def filter_students(*args):
-            search_text = search_var.get().lower()
-            
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            students = self.db_ops.get_all_students()
-            for student in students:
-                if not search_text or search_text in str(student[1]).lower():
-                    student_id = student[0]
-                    full_name = student[1]
-                    dob = student[2].strftime('%Y-%m-%d') if student[2] else ''
-                    gender = student[3]
-                    email = student[4] or ''
-                    phone = student[5] or ''
-                    address = student[6] or ''
-                    
-                    formatted_values = (
-                        student_id,
-                        full_name,
-                        dob,
-                        gender,
-                        email,
-                        phone,
-                        address
-                    )
-                    tree.insert("", tk.END, values=formatted_values)
+            search_text = search_var.get().strip()
+            
+            if search_text:
+                self.worker.submit(self.db_ops.search_students, search_text,
+                                   on_success=table.set_rows, key='students-search')
+            else:
+                self.worker.cancel('students-search')
+                table.set_source(count_students, self.db_ops.get_students_page)
         
-        search_var.trace('w', filter_students)
+        search_var.trace('w', lambda *args: self.debounce('students', filter_students))
         
         context_menu = tk.Menu(tree, tearoff=0)
         context_menu.add_command(label="Edit Student", command=lambda: self.show_edit_student_dialog(tree))
@@ -205,6 +318,7 @@ class SchoolManagementGUI:
         tree.bind("<Button-3>", show_context_menu)
         
         filter_students()
+        return filter_students
 
     def show_add_student_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -238,23 +352,23 @@ class SchoolManagementGUI:
         def save_student():
             try:
                 dob = datetime.datetime.strptime(dob_entry.get(), "%Y-%m-%d").date()
-                if self.db_ops.add_student(
-                    name_entry.get(),
-                    dob,
-                    gender_entry.get().upper(),
-                    email_entry.get(),
-                    phone_entry.get(),
-                    address_entry.get()
-                ):
-                    messagebox.showinfo("Success", "Student added successfully!")
-                    dialog.destroy()
-                    self.show_students()
-                else:
-                    messagebox.showerror("Error", "Failed to add student")
             except ValueError:
                 messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD")
+                return
+            self.run_db_write(
+                self.db_ops.add_student,
+                name_entry.get(),
+                dob,
+                gender_entry.get().upper(),
+                email_entry.get(),
+                phone_entry.get(),
+                address_entry.get(),
+                success="Student added successfully!", failure="Failed to add student",
+                close=dialog, refresh=self.show_students, button=save_button
+            )
         
-        ttk.Button(dialog, text="Save", command=save_student).pack(pady=20)
+        save_button = ttk.Button(dialog, text="Save", command=save_student)
+        save_button.pack(pady=20)
 
     def show_edit_student_dialog(self, tree):
         selected_item = tree.selection()
@@ -263,7 +377,10 @@ class SchoolManagementGUI:
             return
         
         student_id = tree.item(selected_item)['values'][0]
-        student = self.db_ops.get_student(student_id)
+        self.run_db(self.db_ops.get_student, student_id,
+                    on_done=lambda student: self.open_edit_student_dialog(student_id, student))
+
+    def open_edit_student_dialog(self, student_id, student):
         if not student:
             messagebox.showerror("Error", "Student not found")
             return
@@ -305,24 +422,24 @@ class SchoolManagementGUI:
         def update_student():
             try:
                 dob = datetime.datetime.strptime(dob_entry.get(), "%Y-%m-%d").date()
-                if self.db_ops.update_student(
-                    student_id,
-                    name_entry.get(),
-                    dob,
-                    gender_entry.get().upper(),
-                    email_entry.get(),
-                    phone_entry.get(),
-                    address_entry.get()
-                ):
-                    messagebox.showinfo("Success", "Student updated successfully!")
-                    dialog.destroy()
-                    self.show_students()
-                else:
-                    messagebox.showerror("Error", "Failed to update student")
             except ValueError:
                 messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD")
+                return
+            self.run_db_write(
+                self.db_ops.update_student,
+                student_id,
+                name_entry.get(),
+                dob,
+                gender_entry.get().upper(),
+                email_entry.get(),
+                phone_entry.get(),
+                address_entry.get(),
+                success="Student updated successfully!", failure="Failed to update student",
+                close=dialog, refresh=self.show_students, button=update_button
+            )
         
-        ttk.Button(dialog, text="Update", command=update_student).pack(pady=20)
+        update_button = ttk.Button(dialog, text="Update", command=update_student)
+        update_button.pack(pady=20)
 
     def delete_student(self, tree):
         selected_item = tree.selection()
@@ -332,16 +449,15 @@ class SchoolManagementGUI:
         
         student_id = tree.item(selected_item)['values'][0]
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this student?"):
-            if self.db_ops.delete_student(student_id):
-                messagebox.showinfo("Success", "Student deleted successfully!")
-                self.show_students()
-            else:
-                messagebox.showerror("Error", "Failed to delete student")
+            self.run_db_write(self.db_ops.delete_student, student_id,
+                              success="Student deleted successfully!", failure="Failed to delete student",
+                              refresh=self.show_students)
 
     def show_teachers(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('teachers', self.build_teachers_screen, ('Teachers',))
+
+    def build_teachers_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Teachers Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
@@ -361,7 +477,7 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_teacher(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        search_frame = ttk.LabelFrame(self.content_frame, text="Search", padding="5")
+        search_frame = ttk.LabelFrame(frame, text="Search", padding="5")
         search_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(search_frame, text="Search by name:").pack(side=tk.LEFT, padx=5)
@@ -369,7 +485,7 @@ class SchoolManagementGUI:
         search_entry = ttk.Entry(search_frame, textvariable=search_var, width=40)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         table_frame.columnconfigure(0, weight=1)
         table_frame.rowconfigure(0, weight=1)
@@ -397,25 +513,31 @@ class SchoolManagementGUI:
         y_scroll.grid(row=0, column=1, sticky="ns")
         x_scroll.grid(row=1, column=0, sticky="ew")
         
+        def format_teacher(teacher):
+            return (
+                teacher[0],
+                teacher[1],
+                teacher[2] or '',
+                teacher[3] or '',
+                teacher[4] or ''
+            )
+        
+        rows_model = KeyedTableModel(tree, formatter=format_teacher, loader=self.loader)
+        
+        def show_teachers_rows(teachers):
+            rows_model.set_rows(teachers)
+        
         def filter_teachers(*args):
-            search_text = search_var.get().lower()
+            search_text = search_var.get().strip()
             
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            teachers = self.db_ops.get_all_teachers()
-            for teacher in teachers:
-                if not search_text or search_text in str(teacher[1]).lower():
-                    formatted_values = (
-                        teacher[0],
-                        teacher[1],
-                        teacher[2] or '',
-                        teacher[3] or '',
-                        teacher[4] or ''
-                    )
-                    tree.insert("", tk.END, values=formatted_values)
+            if search_text:
+                self.worker.submit(self.db_ops.search_teachers, search_text,
+                                   on_success=show_teachers_rows, key='teachers-search')
+            else:
+                self.worker.submit(self.db_ops.get_all_teachers,
+                                   on_success=show_teachers_rows, key='teachers-search')
         
-        search_var.trace('w', filter_teachers)
+        search_var.trace('w', lambda *args: self.debounce('teachers', filter_teachers))
         
         context_menu = tk.Menu(tree, tearoff=0)
         context_menu.add_command(label="Edit", command=lambda: self.show_edit_teacher_dialog(tree))
@@ -430,6 +552,7 @@ class SchoolManagementGUI:
         tree.bind("<Button-3>", show_context_menu)
         
         filter_teachers()
+        return filter_teachers
 
     def show_add_teacher_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -453,19 +576,18 @@ class SchoolManagementGUI:
         phone_entry.pack()
         
         def save_teacher():
-            if self.db_ops.add_teacher(
+            self.run_db_write(
+                self.db_ops.add_teacher,
                 name_entry.get(),
                 department_entry.get(),
                 email_entry.get(),
-                phone_entry.get()
-            ):
-                messagebox.showinfo("Success", "Teacher added successfully!")
-                dialog.destroy()
-                self.show_teachers()
-            else:
-                messagebox.showerror("Error", "Failed to add teacher")
+                phone_entry.get(),
+                success="Teacher added successfully!", failure="Failed to add teacher",
+                close=dialog, refresh=self.show_teachers, button=save_button
+            )
         
-        ttk.Button(dialog, text="Save", command=save_teacher).pack(pady=20)
+        save_button = ttk.Button(dialog, text="Save", command=save_teacher)
+        save_button.pack(pady=20)
 
     def show_edit_teacher_dialog(self, tree):
         selected_item = tree.selection()
@@ -474,7 +596,10 @@ class SchoolManagementGUI:
             return
         
         teacher_id = tree.item(selected_item)['values'][0]
-        teacher = self.db_ops.get_teacher(teacher_id)
+        self.run_db(self.db_ops.get_teacher, teacher_id,
+                    on_done=lambda teacher: self.open_edit_teacher_dialog(teacher_id, teacher))
+
+    def open_edit_teacher_dialog(self, teacher_id, teacher):
         if not teacher:
             messagebox.showerror("Error", "Teacher not found")
             return
@@ -504,20 +629,19 @@ class SchoolManagementGUI:
         phone_entry.pack()
         
         def update_teacher():
-            if self.db_ops.update_teacher(
+            self.run_db_write(
+                self.db_ops.update_teacher,
                 teacher_id,
                 name_entry.get(),
                 department_entry.get(),
                 email_entry.get(),
-                phone_entry.get()
-            ):
-                messagebox.showinfo("Success", "Teacher updated successfully!")
-                dialog.destroy()
-                self.show_teachers()
-            else:
-                messagebox.showerror("Error", "Failed to update teacher")
+                phone_entry.get(),
+                success="Teacher updated successfully!", failure="Failed to update teacher",
+                close=dialog, refresh=self.show_teachers, button=update_button
+            )
         
-        ttk.Button(dialog, text="Update", command=update_teacher).pack(pady=20)
+        update_button = ttk.Button(dialog, text="Update", command=update_teacher)
+        update_button.pack(pady=20)
 
     def delete_teacher(self, tree):
         selected_item = tree.selection()
@@ -527,16 +651,15 @@ class SchoolManagementGUI:
         
         teacher_id = tree.item(selected_item)['values'][0]
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this teacher?"):
-            if self.db_ops.delete_teacher(teacher_id):
-                messagebox.showinfo("Success", "Teacher deleted successfully!")
-                self.show_teachers()
-            else:
-                messagebox.showerror("Error", "Failed to delete teacher")
+            self.run_db_write(self.db_ops.delete_teacher, teacher_id,
+                              success="Teacher deleted successfully!", failure="Failed to delete teacher",
+                              refresh=self.show_teachers)
 
     def show_classes(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('classes', self.build_classes_screen, ('Classes', 'Teachers'))
+
+    def build_classes_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Classes Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
@@ -556,7 +679,7 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_class(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        search_frame = ttk.LabelFrame(self.content_frame, text="Search", padding="5")
+        search_frame = ttk.LabelFrame(frame, text="Search", padding="5")
         search_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(search_frame, text="Search by class name:").pack(side=tk.LEFT, padx=5)
@@ -564,7 +687,7 @@ class SchoolManagementGUI:
         search_entry = ttk.Entry(search_frame, textvariable=search_var, width=40)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         table_frame.columnconfigure(0, weight=1)
         table_frame.rowconfigure(0, weight=1)
@@ -590,23 +713,29 @@ class SchoolManagementGUI:
         y_scroll.grid(row=0, column=1, sticky="ns")
         x_scroll.grid(row=1, column=0, sticky="ew")
         
+        def format_class(class_info):
+            return (
+                class_info[0],
+                class_info[1],
+                class_info[2] or 'No Teacher'
+            )
+        
+        rows_model = KeyedTableModel(tree, formatter=format_class, loader=self.loader)
+        
+        def show_classes_rows(classes):
+            rows_model.set_rows(classes)
+        
         def filter_classes(*args):
-            search_text = search_var.get().lower()
+            search_text = search_var.get().strip()
             
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            classes = self.db_ops.get_all_classes()
-            for class_info in classes:
-                if not search_text or search_text in str(class_info[1]).lower():
-                    formatted_values = (
-                        class_info[0],
-                        class_info[1],
-                        class_info[2] or 'No Teacher'
-                    )
-                    tree.insert("", tk.END, values=formatted_values)
+            if search_text:
+                self.worker.submit(self.db_ops.search_classes, search_text,
+                                   on_success=show_classes_rows, key='classes-search')
+            else:
+                self.worker.submit(self.db_ops.get_all_classes,
+                                   on_success=show_classes_rows, key='classes-search')
         
-        search_var.trace('w', filter_classes)
+        search_var.trace('w', lambda *args: self.debounce('classes', filter_classes))
         
         context_menu = tk.Menu(tree, tearoff=0)
         context_menu.add_command(label="View Details", command=lambda: self.show_class_details(tree))
@@ -623,6 +752,7 @@ class SchoolManagementGUI:
         tree.bind("<Double-1>", lambda e: self.show_class_details(tree))
         
         filter_classes()
+        return filter_classes
 
     def show_add_class_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -634,26 +764,26 @@ class SchoolManagementGUI:
         name_entry.pack()
         
         ttk.Label(dialog, text="Teacher (Optional):").pack(pady=5)
-        teachers = self.db_ops.get_all_teachers()
         teacher_var = tk.StringVar()
-        teacher_combo = ttk.Combobox(dialog, textvariable=teacher_var, width=37)
-        teacher_combo['values'] = ['None'] + [f"{t[0]} - {t[1]}" for t in teachers]
+        teacher_combo = self.typeahead(dialog, 'teachers', textvariable=teacher_var, width=37, extra_values=('None',))
         teacher_combo.set('None')
         teacher_combo.pack()
+        teacher_combo.reload()
         
         def save_class():
             teacher_id = None
-            if teacher_combo.get() != 'None':
-                teacher_id = int(teacher_combo.get().split(' - ')[0])
+            if teacher_combo.get() not in ('', 'None'):
+                teacher_id = teacher_combo.selected_id
+                if teacher_id is None:
+                    messagebox.showwarning("Warning", "Please select a teacher from the list")
+                    return
                 
-            if self.db_ops.add_class(name_entry.get(), teacher_id):
-                messagebox.showinfo("Success", "Class added successfully!")
-                dialog.destroy()
-                self.show_classes()
-            else:
-                messagebox.showerror("Error", "Failed to add class")
+            self.run_db_write(self.db_ops.add_class, name_entry.get(), teacher_id,
+                              success="Class added successfully!", failure="Failed to add class",
+                              close=dialog, refresh=self.show_classes, button=save_button)
         
-        ttk.Button(dialog, text="Save", command=save_class).pack(pady=20)
+        save_button = ttk.Button(dialog, text="Save", command=save_class)
+        save_button.pack(pady=20)
 
     def show_class_details(self, tree):
         selected_item = tree.selection()
@@ -723,13 +853,19 @@ class SchoolManagementGUI:
         y_scroll.grid(row=0, column=1, sticky="ns")
         x_scroll.grid(row=1, column=0, sticky="ew")
         
-        enrollments = self.db_ops.get_class_enrollments(class_id)
-        for enrollment in enrollments:
-            students_tree.insert("", tk.END, values=enrollment)
+        def load_details():
+            return self.db_ops.get_class_enrollments(class_id), self.db_ops.get_class_subjects(class_id)
         
-        subjects = self.db_ops.get_class_subjects(class_id)
-        for subject in subjects:
-            subjects_tree.insert("", tk.END, values=subject)
+        def show_details(details):
+            if not dialog.winfo_exists():
+                return
+            enrollments, subjects = details
+            for enrollment in enrollments:
+                students_tree.insert("", tk.END, values=enrollment)
+            for subject in subjects:
+                subjects_tree.insert("", tk.END, values=subject)
+        
+        self.run_db(load_details, on_done=show_details)
 
     def show_assign_teacher_dialog(self, tree):
         selected_item = tree.selection()
@@ -744,26 +880,23 @@ class SchoolManagementGUI:
         dialog.geometry("400x200")
         
         ttk.Label(dialog, text="Select Teacher:").pack(pady=5)
-        teachers = self.db_ops.get_all_teachers()
         teacher_var = tk.StringVar()
-        teacher_combo = ttk.Combobox(dialog, textvariable=teacher_var, width=37)
-        teacher_combo['values'] = [f"{t[0]} - {t[1]}" for t in teachers]
+        teacher_combo = self.typeahead(dialog, 'teachers', textvariable=teacher_var, width=37)
         teacher_combo.pack()
+        teacher_combo.reload()
         
         def assign_teacher():
-            if not teacher_combo.get():
+            teacher_id = teacher_combo.selected_id
+            if teacher_id is None:
                 messagebox.showwarning("Warning", "Please select a teacher")
                 return
             
-            teacher_id = int(teacher_combo.get().split(' - ')[0])
-            if self.db_ops.assign_teacher_to_class(class_id, teacher_id):
-                messagebox.showinfo("Success", "Teacher assigned successfully!")
-                dialog.destroy()
-                self.show_classes()
-            else:
-                messagebox.showerror("Error", "Failed to assign teacher")
+            self.run_db_write(self.db_ops.assign_teacher_to_class, class_id, teacher_id,
+                              success="Teacher assigned successfully!", failure="Failed to assign teacher",
+                              close=dialog, refresh=self.show_classes, button=assign_button)
         
-        ttk.Button(dialog, text="Assign", command=assign_teacher).pack(pady=20)
+        assign_button = ttk.Button(dialog, text="Assign", command=assign_teacher)
+        assign_button.pack(pady=20)
 
     def delete_class(self, tree):
         selected_item = tree.selection()
@@ -773,16 +906,15 @@ class SchoolManagementGUI:
             
         class_id = tree.item(selected_item)['values'][0]
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this class?"):
-            if self.db_ops.delete_class(class_id):
-                messagebox.showinfo("Success", "Class deleted successfully!")
-                self.show_classes()
-            else:
-                messagebox.showerror("Error", "Failed to delete class")
+            self.run_db_write(self.db_ops.delete_class, class_id,
+                              success="Class deleted successfully!", failure="Failed to delete class",
+                              refresh=self.show_classes)
 
     def show_subjects(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('subjects', self.build_subjects_screen, ('Subjects',))
+
+    def build_subjects_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Subjects Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
@@ -802,7 +934,7 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_subject(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        search_frame = ttk.LabelFrame(self.content_frame, text="Search", padding="5")
+        search_frame = ttk.LabelFrame(frame, text="Search", padding="5")
         search_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(search_frame, text="Search by subject name:").pack(side=tk.LEFT, padx=5)
@@ -810,7 +942,7 @@ class SchoolManagementGUI:
         search_entry = ttk.Entry(search_frame, textvariable=search_var, width=40)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         table_frame.columnconfigure(0, weight=1)
         table_frame.rowconfigure(0, weight=1)
@@ -836,23 +968,29 @@ class SchoolManagementGUI:
         y_scroll.grid(row=0, column=1, sticky="ns")
         x_scroll.grid(row=1, column=0, sticky="ew")
         
+        def format_subject(subject):
+            return (
+                subject[0],
+                subject[1],
+                subject[2] or ''
+            )
+        
+        rows_model = KeyedTableModel(tree, formatter=format_subject, loader=self.loader)
+        
+        def show_subjects_rows(subjects):
+            rows_model.set_rows(subjects)
+        
         def filter_subjects(*args):
-            search_text = search_var.get().lower()
+            search_text = search_var.get().strip()
             
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            subjects = self.db_ops.get_all_subjects()
-            for subject in subjects:
-                if not search_text or search_text in str(subject[1]).lower():
-                    formatted_values = (
-                        subject[0],
-                        subject[1],
-                        subject[2] or ''
-                    )
-                    tree.insert("", tk.END, values=formatted_values)
+            if search_text:
+                self.worker.submit(self.db_ops.search_subjects, search_text,
+                                   on_success=show_subjects_rows, key='subjects-search')
+            else:
+                self.worker.submit(self.db_ops.get_all_subjects,
+                                   on_success=show_subjects_rows, key='subjects-search')
         
-        search_var.trace('w', filter_subjects)
+        search_var.trace('w', lambda *args: self.debounce('subjects', filter_subjects))
         
         context_menu = tk.Menu(tree, tearoff=0)
         context_menu.add_command(label="Edit", command=lambda: self.show_edit_subject_dialog(tree))
@@ -867,6 +1005,7 @@ class SchoolManagementGUI:
         tree.bind("<Button-3>", show_context_menu)
         
         filter_subjects()
+        return filter_subjects
 
     def show_add_subject_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -882,17 +1021,16 @@ class SchoolManagementGUI:
         description_text.pack()
         
         def save_subject():
-            if self.db_ops.add_subject(
+            self.run_db_write(
+                self.db_ops.add_subject,
                 name_entry.get(),
-                description_text.get("1.0", tk.END).strip()
-            ):
-                messagebox.showinfo("Success", "Subject added successfully!")
-                dialog.destroy()
-                self.show_subjects()
-            else:
-                messagebox.showerror("Error", "Failed to add subject")
+                description_text.get("1.0", tk.END).strip(),
+                success="Subject added successfully!", failure="Failed to add subject",
+                close=dialog, refresh=self.show_subjects, button=save_button
+            )
         
-        ttk.Button(dialog, text="Save", command=save_subject).pack(pady=20)
+        save_button = ttk.Button(dialog, text="Save", command=save_subject)
+        save_button.pack(pady=20)
 
     def show_edit_subject_dialog(self, tree):
         selected_item = tree.selection()
@@ -901,7 +1039,10 @@ class SchoolManagementGUI:
             return
         
         subject_id = tree.item(selected_item)['values'][0]
-        subject = self.db_ops.get_subject(subject_id)
+        self.run_db(self.db_ops.get_subject, subject_id,
+                    on_done=lambda subject: self.open_edit_subject_dialog(subject_id, subject))
+
+    def open_edit_subject_dialog(self, subject_id, subject):
         if not subject:
             messagebox.showerror("Error", "Subject not found")
             return
@@ -921,18 +1062,17 @@ class SchoolManagementGUI:
         description_text.pack()
         
         def update_subject():
-            if self.db_ops.update_subject(
+            self.run_db_write(
+                self.db_ops.update_subject,
                 subject_id,
                 name_entry.get(),
-                description_text.get("1.0", tk.END).strip()
-            ):
-                messagebox.showinfo("Success", "Subject updated successfully!")
-                dialog.destroy()
-                self.show_subjects()
-            else:
-                messagebox.showerror("Error", "Failed to update subject")
+                description_text.get("1.0", tk.END).strip(),
+                success="Subject updated successfully!", failure="Failed to update subject",
+                close=dialog, refresh=self.show_subjects, button=update_button
+            )
         
-        ttk.Button(dialog, text="Update", command=update_subject).pack(pady=20)
+        update_button = ttk.Button(dialog, text="Update", command=update_subject)
+        update_button.pack(pady=20)
 
     def delete_subject(self, tree):
         selected_item = tree.selection()
@@ -942,16 +1082,15 @@ class SchoolManagementGUI:
         
         subject_id = tree.item(selected_item)['values'][0]
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this subject?"):
-            if self.db_ops.delete_subject(subject_id):
-                messagebox.showinfo("Success", "Subject deleted successfully!")
-                self.show_subjects()
-            else:
-                messagebox.showerror("Error", "Failed to delete subject")
+            self.run_db_write(self.db_ops.delete_subject, subject_id,
+                              success="Subject deleted successfully!", failure="Failed to delete subject",
+                              refresh=self.show_subjects)
 
     def show_enrollments(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('enrollments', self.build_enrollments_screen, ('Enrollments', 'Students', 'Classes'))
+
+    def build_enrollments_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Enrollments Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
@@ -971,7 +1110,7 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_enrollment(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        filter_frame = ttk.LabelFrame(self.content_frame, text="Search and Filters", padding="5")
+        filter_frame = ttk.LabelFrame(frame, text="Search and Filters", padding="5")
         filter_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(filter_frame, text="Search by student:").pack(side=tk.LEFT, padx=5)
@@ -982,17 +1121,35 @@ class SchoolManagementGUI:
         ttk.Label(filter_frame, text="Filter by Class:").pack(side=tk.LEFT, padx=5)
         class_var = tk.StringVar(value='All Classes')
         class_combo = ttk.Combobox(filter_frame, textvariable=class_var, width=30)
-        classes = self.db_ops.get_all_classes()
-        class_combo['values'] = ['All Classes'] + [c[1] for c in classes]
+        
+        def load_class_filter():
+            self.worker.submit(self.db_ops.get_all_classes,
+                               on_success=lambda classes: self.set_values(
+                                   class_combo, ['All Classes'] + [c[1] for c in classes]),
+                               key='enrollments-classes')
+        
+        load_class_filter()
         class_combo.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         table_frame.columnconfigure(0, weight=1)
         table_frame.rowconfigure(0, weight=1)
         
-        columns = ("Student ID", "Student Name", "Class", "Enrollment Date")
-        tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        def format_enrollment(enrollment):
+            return (
+                enrollment[0],
+                enrollment[1],
+                enrollment[2],
+                enrollment[3].strftime('%Y-%m-%d') if enrollment[3] else '',
+                enrollment[4]
+            )
+        
+        columns = ("Student ID", "Student Name", "Class", "Enrollment Date", "Class ID")
+        table = VirtualTable(table_frame, columns, formatter=format_enrollment,
+                             key=lambda enrollment: f"{enrollment[0]}:{enrollment[4]}", worker=self.worker)
+        tree = table.tree
+        tree['displaycolumns'] = columns[:-1]
         
         col_widths = {
             "Student ID": 80,
@@ -1005,38 +1162,16 @@ class SchoolManagementGUI:
             tree.heading(col, text=col.title())
             tree.column(col, width=col_widths.get(col, 150), minwidth=50)
         
-        y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-        x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        
-        tree.grid(row=0, column=0, sticky="nsew")
-        y_scroll.grid(row=0, column=1, sticky="ns")
-        x_scroll.grid(row=1, column=0, sticky="ew")
-        
         def filter_enrollments(*args):
-            search_text = search_var.get().lower()
+            search_text = search_var.get().strip()
             class_filter = class_var.get()
             
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            enrollments = []
-            if class_filter == 'All Classes':
-                enrollments = self.db_ops.get_all_enrollments()
-            else:
-                enrollments = self.db_ops.get_class_enrollments_by_name(class_filter)
-            
-            for enrollment in enrollments:
-                if not search_text or search_text in str(enrollment[1]).lower():
-                    formatted_values = (
-                        enrollment[0],
-                        enrollment[1],
-                        enrollment[2],
-                        enrollment[3].strftime('%Y-%m-%d') if enrollment[3] else ''
-                    )
-                    tree.insert("", tk.END, values=formatted_values)
+            table.set_source(
+                lambda: self.db_ops.count_enrollments(class_filter, search_text),
+                lambda offset, limit: self.db_ops.get_enrollments_page(class_filter, search_text, offset, limit)
+            )
         
-        search_var.trace('w', filter_enrollments)
+        search_var.trace('w', lambda *args: self.debounce('enrollments', filter_enrollments))
         class_combo.bind('<<ComboboxSelected>>', filter_enrollments)
         
         context_menu = tk.Menu(tree, tearoff=0)
@@ -1052,6 +1187,12 @@ class SchoolManagementGUI:
         tree.bind("<Button-3>", show_context_menu)
         
         filter_enrollments()
+        
+        def refresh():
+            load_class_filter()
+            filter_enrollments()
+        
+        return refresh
 
     def show_add_enrollment_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -1059,44 +1200,45 @@ class SchoolManagementGUI:
         dialog.geometry("400x300")
         
         ttk.Label(dialog, text="Select Student:").pack(pady=5)
-        students = self.db_ops.get_all_students()
         student_var = tk.StringVar()
-        student_combo = ttk.Combobox(dialog, textvariable=student_var, width=37)
-        student_combo['values'] = [f"{s[0]} - {s[1]}" for s in students]
+        student_combo = self.typeahead(dialog, 'students', textvariable=student_var, width=37)
         student_combo.pack()
+        student_combo.reload()
         
         ttk.Label(dialog, text="Select Class:").pack(pady=5)
-        classes = self.db_ops.get_all_classes()
         class_var = tk.StringVar()
-        class_combo = ttk.Combobox(dialog, textvariable=class_var, width=37)
-        class_combo['values'] = [f"{c[0]} - {c[1]}" for c in classes]
+        class_combo = self.typeahead(dialog, 'classes', textvariable=class_var, width=37)
         class_combo.pack()
+        class_combo.reload()
         
         def save_enrollment():
-            if not student_combo.get() or not class_combo.get():
+            student_id = student_combo.selected_id
+            class_id = class_combo.selected_id
+            if student_id is None or class_id is None:
                 messagebox.showwarning("Warning", "Please select both student and class")
                 return
-                
-            student_id = int(student_combo.get().split(' - ')[0])
-            class_id = int(class_combo.get().split(' - ')[0])
             
-            enrollments = self.db_ops.get_class_enrollments(class_id)
-            for enrollment in enrollments:
-                if enrollment[0] == student_id:
-                    messagebox.showerror("Error", "Student is already enrolled in this class")
-                    return
+            def enroll():
+                # Runs on the worker; None means the student was already enrolled
+                for enrollment in self.db_ops.get_class_enrollments(class_id):
+                    if enrollment[0] == student_id:
+                        return None
+                return self.db_ops.enroll_student_in_class(student_id, class_id)
             
-            try:
-                if self.db_ops.enroll_student_in_class(student_id, class_id):
+            def enrolled(result):
+                if result is None:
+                    messagebox.showerror("Error", "Student is already enrolled in this class")
+                elif result:
                     messagebox.showinfo("Success", "Student enrolled successfully!")
                     dialog.destroy()
                     self.show_enrollments()
                 else:
                     messagebox.showerror("Error", "Failed to enroll student")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to enroll student: {str(e)}")
+            
+            self.run_db(enroll, on_done=enrolled, button=enroll_button)
         
-        ttk.Button(dialog, text="Enroll", command=save_enrollment).pack(pady=20)
+        enroll_button = ttk.Button(dialog, text="Enroll", command=save_enrollment)
+        enroll_button.pack(pady=20)
 
     def show_edit_enrollment_dialog(self, tree):
         selected_item = tree.selection()
@@ -1106,6 +1248,7 @@ class SchoolManagementGUI:
         
         student_id = tree.item(selected_item)['values'][0]
         current_class = tree.item(selected_item)['values'][2]
+        current_class_id = tree.item(selected_item)['values'][4]
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Enrollment")
@@ -1115,26 +1258,23 @@ class SchoolManagementGUI:
         ttk.Label(dialog, text=f"Current Class: {current_class}").pack(pady=5)
         
         ttk.Label(dialog, text="Select New Class:").pack(pady=5)
-        classes = self.db_ops.get_all_classes()
         class_var = tk.StringVar()
-        class_combo = ttk.Combobox(dialog, textvariable=class_var, width=37)
-        class_combo['values'] = [f"{c[0]} - {c[1]}" for c in classes]
+        class_combo = self.typeahead(dialog, 'classes', textvariable=class_var, width=37)
         class_combo.pack(pady=5)
+        class_combo.reload()
         
         def update_enrollment():
-            if not class_combo.get():
+            new_class_id = class_combo.selected_id
+            if new_class_id is None:
                 messagebox.showwarning("Warning", "Please select a class")
                 return
             
-            new_class_id = int(class_combo.get().split(' - ')[0])
-            
-            if self.db_ops.delete_enrollment(student_id, current_class) and \
-               self.db_ops.enroll_student_in_class(student_id, new_class_id):
-                messagebox.showinfo("Success", "Enrollment updated successfully!")
-                dialog.destroy()
-                self.show_enrollments()
-            else:
-                messagebox.showerror("Error", "Failed to update enrollment")
+            self.run_db_write(self.db_ops.move_enrollment_by_id, student_id, current_class_id, new_class_id,
+                              success="Enrollment updated successfully!", failure="Failed to update enrollment",
+                              close=dialog, refresh=self.show_enrollments, button=update_button)
+        
+        update_button = ttk.Button(dialog, text="Update", command=update_enrollment)
+        update_button.pack(pady=20)
 
     def delete_enrollment(self, tree):
         selected_item = tree.selection()
@@ -1144,19 +1284,20 @@ class SchoolManagementGUI:
         
         student_id = tree.item(selected_item)['values'][0]
         class_name = tree.item(selected_item)['values'][2]
+        class_id = tree.item(selected_item)['values'][4]
         
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to remove this student from {class_name}?"):
-            if self.db_ops.delete_enrollment(student_id, class_name):
-                messagebox.showinfo("Success", "Enrollment deleted successfully!")
-                self.show_enrollments()
-            else:
-                messagebox.showerror("Error", "Failed to delete enrollment")
+            self.run_db_write(self.db_ops.delete_enrollment_by_id, student_id, class_id,
+                              success="Enrollment deleted successfully!", failure="Failed to delete enrollment",
+                              refresh=self.show_enrollments)
 
     def show_grades(self):
-        self.clear_main_content()
+        self.screens.show('grades', self.build_grades_screen, ('Grades', 'Students', 'Classes', 'Subjects'))
+
+    def build_grades_screen(self, frame):
         print("Initializing grades view...")
         
-        header_frame = ttk.Frame(self.content_frame)
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=5, pady=(0, 20))
         
         ttk.Label(header_frame, text="Grades Management", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT)
@@ -1176,28 +1317,43 @@ class SchoolManagementGUI:
                   command=lambda: self.delete_grade(tree),
                   style='Action.TButton').pack(side=tk.LEFT, padx=2)
         
-        filter_frame = ttk.LabelFrame(self.content_frame, text="Filters", padding="5")
+        filter_frame = ttk.LabelFrame(frame, text="Filters", padding="5")
         filter_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
         
         ttk.Label(filter_frame, text="Filter by Class:").pack(side=tk.LEFT, padx=5)
         class_var = tk.StringVar(value='All')
         class_combo = ttk.Combobox(filter_frame, textvariable=class_var, width=20)
-        classes = self.db_ops.get_all_classes()
-        class_combo['values'] = ['All'] + [c[1] for c in classes]
         class_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Label(filter_frame, text="Filter by Subject:").pack(side=tk.LEFT, padx=5)
         subject_var = tk.StringVar(value='All')
         subject_combo = ttk.Combobox(filter_frame, textvariable=subject_var, width=20)
-        subjects = self.db_ops.get_all_subjects()
-        subject_combo['values'] = ['All'] + [s[1] for s in subjects]
         subject_combo.pack(side=tk.LEFT, padx=5)
         
-        table_frame = ttk.Frame(self.content_frame)
+        def load_filters():
+            self.worker.submit(self.db_ops.get_all_classes,
+                               on_success=lambda classes: self.set_values(class_combo, ['All'] + [c[1] for c in classes]),
+                               key='grades-classes')
+            self.worker.submit(self.db_ops.get_all_subjects,
+                               on_success=lambda subjects: self.set_values(subject_combo, ['All'] + [s[1] for s in subjects]),
+                               key='grades-subjects')
+        
+        load_filters()
+        
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5)
         
+        def format_grade(grade):
+            try:
+                grade_display = f"{float(grade[4]):.1f}"
+            except (TypeError, ValueError):
+                print(f"Error formatting grade data: {grade}")
+                grade_display = str(grade[4])
+            return (grade[0], grade[1], grade[2], grade[3], grade_display)
+        
         columns = ("ID", "Student", "Class", "Subject", "Grade")
-        tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        table = VirtualTable(table_frame, columns, formatter=format_grade, worker=self.worker)
+        tree = table.tree
         
         column_widths = {
             "ID": 80,
@@ -1213,43 +1369,17 @@ class SchoolManagementGUI:
             if col in ["Grade", "ID"]:
                 tree.column(col, anchor="center")
         
-        y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-        x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        
-        tree.grid(row=0, column=0, sticky="nsew")
-        y_scroll.grid(row=0, column=1, sticky="ns")
-        x_scroll.grid(row=1, column=0, sticky="ew")
-        
-        table_frame.grid_rowconfigure(0, weight=1)
-        table_frame.grid_columnconfigure(0, weight=1)
-        
         def filter_grades(*args):
             print("Filtering grades...")
-            for item in tree.get_children():
-                tree.delete(item)
-            
             try:
                 class_filter = class_var.get()
                 subject_filter = subject_var.get()
                 print(f"Applying filters - Class: {class_filter}, Subject: {subject_filter}")
                 
-                grades = self.db_ops.get_filtered_grades(class_filter, subject_filter)
-                print(f"Retrieved {len(grades)} grades from database")
-                
-                for grade in grades:
-                    try:
-                        formatted_values = (
-                            grade[0], 
-                            grade[1],  
-                            grade[2], 
-                            grade[3], 
-                            f"{float(grade[4]):.1f}" 
-                        )
-                        tree.insert("", tk.END, values=formatted_values)
-                    except Exception as e:
-                        print(f"Error formatting grade data: {str(e)}")
-                        print(f"Grade data: {grade}")
+                table.set_source(
+                    lambda: self.db_ops.count_filtered_grades(class_filter, subject_filter),
+                    lambda offset, limit: self.db_ops.get_filtered_grades_page(class_filter, subject_filter, offset, limit)
+                )
             except Exception as e:
                 print(f"Error in filter_grades: {str(e)}")
                 messagebox.showerror("Error", f"Failed to load grades: {str(e)}")
@@ -1271,6 +1401,12 @@ class SchoolManagementGUI:
                 context_menu.post(event.x_root, event.y_root)
         
         tree.bind("<Button-3>", show_context_menu)
+        
+        def refresh():
+            load_filters()
+            filter_grades()
+        
+        return refresh
 
     def show_add_grade_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -1279,10 +1415,9 @@ class SchoolManagementGUI:
         
         ttk.Label(dialog, text="Select Class:").pack(pady=5)
         class_var = tk.StringVar()
-        class_combo = ttk.Combobox(dialog, textvariable=class_var, width=40)
-        classes = self.db_ops.get_all_classes()
-        class_combo['values'] = [f"{c[0]} - {c[1]}" for c in classes]
+        class_combo = self.typeahead(dialog, 'classes', textvariable=class_var, width=40)
         class_combo.pack()
+        class_combo.reload()
         
         ttk.Label(dialog, text="Select Subject:").pack(pady=5)
         subject_var = tk.StringVar()
@@ -1291,31 +1426,40 @@ class SchoolManagementGUI:
         
         ttk.Label(dialog, text="Select Student:").pack(pady=5)
         student_var = tk.StringVar()
-        student_combo = ttk.Combobox(dialog, textvariable=student_var, width=40)
+        # A class's roster is loaded once and searched in memory as the user types
+        student_combo = TypeaheadCombobox(dialog, PrefixIndex([]).search, textvariable=student_var, width=40)
         student_combo.pack()
         
         def update_subjects(*args):
-            if class_var.get():
-                class_id = int(class_var.get().split(' - ')[0])
-                subjects = self.db_ops.get_class_subjects(class_id)
-                subject_combo['values'] = [f"{s[0]} - {s[1]}" for s in subjects]
+            class_id = class_combo.selected_id
+            if class_id is not None:
                 subject_var.set('')
+                self.worker.submit(self.db_ops.get_class_subjects, class_id,
+                                   on_success=lambda subjects: self.set_values(
+                                       subject_combo, [f"{s[0]} - {s[1]}" for s in subjects]),
+                                   key=('grade-dialog-subjects', str(dialog)))
+        
+        def show_class_students(students):
+            if student_combo.winfo_exists():
+                student_combo.set_source(PrefixIndex(students).search)
         
         def update_students(*args):
-            if class_var.get():
-                class_id = int(class_var.get().split(' - ')[0])
-                students = self.db_ops.get_class_enrollments(class_id)
-                student_combo['values'] = [f"{s[0]} - {s[1]}" for s in students]
-                student_var.set('')
+            class_id = class_combo.selected_id
+            if class_id is not None:
+                self.worker.submit(self.db_ops.get_class_enrollments, class_id,
+                                   on_success=show_class_students,
+                                   key=('grade-dialog-students', str(dialog)))
         
-        class_combo.bind('<<ComboboxSelected>>', lambda e: [update_subjects(), update_students()])
+        class_combo.bind('<<ComboboxSelected>>', lambda e: [update_subjects(), update_students()], add='+')
         
         ttk.Label(dialog, text="Grade (0-100):").pack(pady=5)
         grade_entry = ttk.Entry(dialog, width=40)
         grade_entry.pack()
         
         def save_grade():
-            if not all([class_var.get(), subject_var.get(), student_var.get(), grade_entry.get()]):
+            class_id = class_combo.selected_id
+            student_id = student_combo.selected_id
+            if class_id is None or student_id is None or not all([subject_var.get(), grade_entry.get()]):
                 messagebox.showerror("Error", "All fields are required")
                 return
             
@@ -1324,22 +1468,16 @@ class SchoolManagementGUI:
                 if grade < 0 or grade > 100:
                     raise ValueError("Grade must be between 0 and 100")
                 
-                class_id = int(class_var.get().split(' - ')[0])
                 subject_id = int(subject_var.get().split(' - ')[0])
-                student_id = int(student_var.get().split(' - ')[0])
-                
-                if self.db_ops.add_grade(student_id, class_id, subject_id, grade):
-                    messagebox.showinfo("Success", "Grade added successfully!")
-                    dialog.destroy()
-                    self.show_grades()
-                else:
-                    messagebox.showerror("Error", "Failed to add grade")
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to add grade: {str(e)}")
+                return
+            self.run_db_write(self.db_ops.add_grade, student_id, class_id, subject_id, grade,
+                              success="Grade added successfully!", failure="Failed to add grade",
+                              close=dialog, refresh=self.show_grades, button=save_button)
         
-        ttk.Button(dialog, text="Save", command=save_grade, style='Action.TButton').pack(pady=20)
+        save_button = ttk.Button(dialog, text="Save", command=save_grade, style='Action.TButton')
+        save_button.pack(pady=20)
 
     def show_edit_grade_dialog(self, tree):
         selected_item = tree.selection()
@@ -1348,7 +1486,10 @@ class SchoolManagementGUI:
             return
         
         grade_id = tree.item(selected_item[0])['values'][0]
-        grade_data = self.db_ops.get_grade(grade_id)
+        self.run_db(self.db_ops.get_grade, grade_id,
+                    on_done=lambda grade_data: self.open_edit_grade_dialog(grade_id, grade_data))
+
+    def open_edit_grade_dialog(self, grade_id, grade_data):
         if not grade_data:
             messagebox.showerror("Error", "Grade not found")
             return
@@ -1371,17 +1512,15 @@ class SchoolManagementGUI:
                 grade = float(grade_entry.get())
                 if grade < 0 or grade > 100:
                     raise ValueError("Grade must be between 0 and 100")
-                
-                if self.db_ops.update_grade(grade_id, grade):
-                    messagebox.showinfo("Success", "Grade updated successfully!")
-                    dialog.destroy()
-                    self.show_grades()
-                else:
-                    messagebox.showerror("Error", "Failed to update grade")
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
+                return
+            self.run_db_write(self.db_ops.update_grade, grade_id, grade,
+                              success="Grade updated successfully!", failure="Failed to update grade",
+                              close=dialog, refresh=self.show_grades, button=update_button)
         
-        ttk.Button(dialog, text="Update", command=update_grade, style='Action.TButton').pack(pady=20)
+        update_button = ttk.Button(dialog, text="Update", command=update_grade, style='Action.TButton')
+        update_button.pack(pady=20)
 
     def delete_grade(self, tree):
         selected_item = tree.selection()
@@ -1391,21 +1530,20 @@ class SchoolManagementGUI:
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this grade?"):
             grade_id = tree.item(selected_item[0])['values'][0]
-            if self.db_ops.delete_grade(grade_id):
-                messagebox.showinfo("Success", "Grade deleted successfully!")
-                self.show_grades()
-            else:
-                messagebox.showerror("Error", "Failed to delete grade")
+            self.run_db_write(self.db_ops.delete_grade, grade_id,
+                              success="Grade deleted successfully!", failure="Failed to delete grade",
+                              refresh=self.show_grades)
 
     def show_reports(self):
-        self.clear_main_content()
-        
-        header_frame = ttk.Frame(self.content_frame)
+        self.screens.show('reports', self.build_reports_screen, ('Students', 'Teachers', 'Classes'))
+
+    def build_reports_screen(self, frame):
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         
         ttk.Label(header_frame, text="Reports", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT, padx=5)
         
-        notebook = ttk.Notebook(self.content_frame)
+        notebook = ttk.Notebook(frame)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         class_performance_frame = ttk.Frame(notebook, padding="10")
@@ -1416,9 +1554,7 @@ class SchoolManagementGUI:
         
         ttk.Label(filter_frame, text="Select Class:").pack(side=tk.LEFT, padx=5)
         class_var = tk.StringVar()
-        class_combo = ttk.Combobox(filter_frame, textvariable=class_var, width=30)
-        classes = self.db_ops.get_all_classes()
-        class_combo['values'] = [c[1] for c in classes]
+        class_combo = self.typeahead(filter_frame, 'classes', textvariable=class_var, width=30)
         class_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(filter_frame, text="Generate Report", 
@@ -1428,23 +1564,16 @@ class SchoolManagementGUI:
         table_frame = ttk.Frame(class_performance_frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5)
         
-        columns = ("Subject", "Average Grade", "Highest Grade", "Lowest Grade", "Students Count")
+        columns = ("Subject", "Average Grade", "Highest Grade", "Lowest Grade", "Grades Count",
+                   "Median", "10th Percentile", "90th Percentile", "Std Dev")
         class_tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=15)
         
         class_tree.heading("Subject", text="Subject")
         class_tree.column("Subject", width=200, anchor="w")
         
-        class_tree.heading("Average Grade", text="Average Grade")
-        class_tree.column("Average Grade", width=150, anchor="center")
-        
-        class_tree.heading("Highest Grade", text="Highest Grade")
-        class_tree.column("Highest Grade", width=150, anchor="center")
-        
-        class_tree.heading("Lowest Grade", text="Lowest Grade")
-        class_tree.column("Lowest Grade", width=150, anchor="center")
-        
-        class_tree.heading("Students Count", text="Students Count")
-        class_tree.column("Students Count", width=150, anchor="center")
+        for column in columns[1:]:
+            class_tree.heading(column, text=column)
+            class_tree.column(column, width=110, anchor="center")
         
         y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=class_tree.yview)
         x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=class_tree.xview)
@@ -1455,30 +1584,36 @@ class SchoolManagementGUI:
         x_scroll.pack(side='bottom', fill='x')
         
         def generate_class_report():
-            if not class_var.get():
+            class_id = class_combo.selected_id
+            if class_id is None:
                 messagebox.showwarning("Warning", "Please select a class")
                 return
             
             for item in class_tree.get_children():
                 class_tree.delete(item)
             
-            try:
-                performance_data = self.db_ops.get_class_performance_report(class_var.get())
-                
-                if not performance_data:
-                    messagebox.showinfo("Info", "No performance data available for this class")
-                    return
-                
-                for row in performance_data:
-                    class_tree.insert("", tk.END, values=(
-                        row[0],
-                        f"{row[1]:.1f}%",
-                        f"{row[2]:.1f}%",
-                        f"{row[3]:.1f}%",
-                        f"{row[4]}"
-                    ))
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+            self.worker.submit(self.db_ops.get_class_grade_statistics_by_id, class_id,
+                               on_success=show_class_report,
+                               on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"),
+                               key='class-report')
+        
+        def show_class_report(performance_data):
+            if not performance_data:
+                messagebox.showinfo("Info", "No performance data available for this class")
+                return
+            
+            for row in performance_data:
+                class_tree.insert("", tk.END, values=(
+                    row[0],
+                    f"{row[1]:.1f}%",
+                    f"{row[2]:.1f}%",
+                    f"{row[3]:.1f}%",
+                    f"{row[4]}",
+                    f"{row[5]:.1f}%",
+                    f"{row[6]:.1f}%",
+                    f"{row[7]:.1f}%",
+                    f"{row[8]:.1f}"
+                ))
         
         teacher_load_frame = ttk.Frame(notebook, padding="10")
         notebook.add(teacher_load_frame, text="Teacher Load")
@@ -1488,9 +1623,9 @@ class SchoolManagementGUI:
         
         ttk.Label(teacher_filter_frame, text="Select Teacher:").pack(side=tk.LEFT, padx=5)
         teacher_var = tk.StringVar()
-        teacher_combo = ttk.Combobox(teacher_filter_frame, textvariable=teacher_var, width=30)
-        teachers = self.db_ops.get_all_teachers()
-        teacher_combo['values'] = [t[1] for t in teachers]
+        all_teachers = "All Teachers"
+        teacher_combo = self.typeahead(teacher_filter_frame, 'teachers', textvariable=teacher_var, width=30,
+                                       extra_values=(all_teachers,))
         teacher_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(teacher_filter_frame, text="Generate Report",
@@ -1500,20 +1635,19 @@ class SchoolManagementGUI:
         teacher_table_frame = ttk.Frame(teacher_load_frame)
         teacher_table_frame.pack(fill=tk.BOTH, expand=True, padx=5)
         
-        columns = ("Class", "Students Count", "Subjects", "Total Hours")
-        teacher_tree = ttk.Treeview(teacher_table_frame, columns=columns, show='headings', height=15)
-        
-        teacher_tree.heading("Class", text="Class")
-        teacher_tree.column("Class", width=200, anchor="w")
+        class_load_columns = (("Class", 200, "w"), ("Students Count", 150, "center"),
+                              ("Subjects", 250, "w"), ("Total Hours", 150, "center"))
+        all_teachers_columns = (("Teacher", 200, "w"), ("Classes", 100, "center"), ("Students Count", 150, "center"),
+                                ("Subjects", 250, "w"), ("Total Hours", 150, "center"))
+        teacher_tree = ttk.Treeview(teacher_table_frame, show='headings', height=15)
         
-        teacher_tree.heading("Students Count", text="Students Count")
-        teacher_tree.column("Students Count", width=150, anchor="center")
+        def set_teacher_columns(columns):
+            teacher_tree.configure(columns=[name for name, _, _ in columns])
+            for name, width, anchor in columns:
+                teacher_tree.heading(name, text=name)
+                teacher_tree.column(name, width=width, anchor=anchor)
         
-        teacher_tree.heading("Subjects", text="Subjects")
-        teacher_tree.column("Subjects", width=250, anchor="w")
-        
-        teacher_tree.heading("Total Hours", text="Total Hours")
-        teacher_tree.column("Total Hours", width=150, anchor="center")
+        set_teacher_columns(class_load_columns)
         
         y_scroll = ttk.Scrollbar(teacher_table_frame, orient="vertical", command=teacher_tree.yview)
         x_scroll = ttk.Scrollbar(teacher_table_frame, orient="horizontal", command=teacher_tree.xview)
@@ -1524,29 +1658,54 @@ class SchoolManagementGUI:
         x_scroll.pack(side='bottom', fill='x')
         
         def generate_teacher_report():
-            if not teacher_var.get():
+            teacher_id = teacher_combo.selected_id
+            if teacher_var.get() != all_teachers and teacher_id is None:
                 messagebox.showwarning("Warning", "Please select a teacher")
                 return
             
             for item in teacher_tree.get_children():
                 teacher_tree.delete(item)
             
-            try:
-                load_data = self.db_ops.get_teacher_load_report(teacher_var.get())
-                
-                if not load_data:
-                    messagebox.showinfo("Info", "No load data available for this teacher")
-                    return
-                
-                for row in load_data:
-                    teacher_tree.insert("", tk.END, values=(
-                        row[0],
-                        f"{row[1]}",
-                        row[2],
-                        f"{row[3]} hrs"
-                    ))
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+            if teacher_var.get() == all_teachers:
+                self.worker.submit(self.db_ops.get_all_teacher_loads,
+                                   on_success=show_all_teacher_loads,
+                                   on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"),
+                                   key='teacher-report')
+                return
+            
+            self.worker.submit(self.db_ops.get_teacher_load_report_by_id, teacher_id,
+                               on_success=show_teacher_report,
+                               on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"),
+                               key='teacher-report')
+        
+        def show_teacher_report(load_data):
+            if not load_data:
+                messagebox.showinfo("Info", "No load data available for this teacher")
+                return
+            
+            set_teacher_columns(class_load_columns)
+            for row in load_data:
+                teacher_tree.insert("", tk.END, values=(
+                    row[0],
+                    f"{row[1]}",
+                    row[2],
+                    f"{row[3]} hrs"
+                ))
+        
+        def show_all_teacher_loads(load_data):
+            if not load_data:
+                messagebox.showinfo("Info", "No teachers found")
+                return
+            
+            set_teacher_columns(all_teachers_columns)
+            for row in load_data:
+                teacher_tree.insert("", tk.END, values=(
+                    row[1],
+                    f"{row[2]}",
+                    f"{row[3]}",
+                    row[4],
+                    f"{row[5]} hrs"
+                ))
         
         student_performance_frame = ttk.Frame(notebook, padding="10")
         notebook.add(student_performance_frame, text="Student Performance")
@@ -1556,9 +1715,7 @@ class SchoolManagementGUI:
         
         ttk.Label(student_filter_frame, text="Select Student:").pack(side=tk.LEFT, padx=5)
         student_var = tk.StringVar()
-        student_combo = ttk.Combobox(student_filter_frame, textvariable=student_var, width=30)
-        students = self.db_ops.get_all_students()
-        student_combo['values'] = [s[1] for s in students]
+        student_combo = self.typeahead(student_filter_frame, 'students', textvariable=student_var, width=30)
         student_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(student_filter_frame, text="Generate Report",
@@ -1568,7 +1725,7 @@ class SchoolManagementGUI:
         student_table_frame = ttk.Frame(student_performance_frame)
         student_table_frame.pack(fill=tk.BOTH, expand=True, padx=5)
         
-        columns = ("Subject", "Grade", "Class", "Date")
+        columns = ("Subject", "Grade", "Class", "Date", "Rank")
         student_tree = ttk.Treeview(student_table_frame, columns=columns, show='headings', height=15)
         
         student_tree.heading("Subject", text="Subject")
@@ -1583,6 +1740,9 @@ class SchoolManagementGUI:
         student_tree.heading("Date", text="Date")
         student_tree.column("Date", width=150, anchor="center")
         
+        student_tree.heading("Rank", text="Rank in Class")
+        student_tree.column("Rank", width=150, anchor="center")
+        
         y_scroll = ttk.Scrollbar(student_table_frame, orient="vertical", command=student_tree.yview)
         x_scroll = ttk.Scrollbar(student_table_frame, orient="horizontal", command=student_tree.xview)
         student_tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
@@ -1592,70 +1752,101 @@ class SchoolManagementGUI:
         x_scroll.pack(side='bottom', fill='x')
         
         def generate_student_report():
-            if not student_var.get():
+            student_id = student_combo.selected_id
+            if student_id is None:
                 messagebox.showwarning("Warning", "Please select a student")
                 return
             
             for item in student_tree.get_children():
                 student_tree.delete(item)
             
-            try:
-                print(f"Generating report for student: {student_var.get()}")
-                performance_data = self.db_ops.get_student_grades(student_var.get())
-                
-                if not performance_data:
-                    messagebox.showinfo("Info", "No performance data available for this student")
-                    return
-                
-                print(f"Retrieved {len(performance_data)} grade records")
-                
-                for row in performance_data:
-                    try:
-                        grade_value = row[1]
-                        if grade_value is not None:
-                            try:
-                                grade_display = f"{float(grade_value):.1f}%"
-                            except (ValueError, TypeError):
-                                grade_display = str(grade_value)
-                        else:
-                            grade_display = "N/A"
-                        
-                        date_value = row[3]
-                        if date_value:
-                            try:
-                                date_display = date_value.strftime('%Y-%m-%d')
-                            except AttributeError:
-                                date_display = str(date_value)
-                        else:
-                            date_display = ""
-                            
-                        formatted_values = (
-                            row[0] or "Unknown", 
-                            grade_display,       
-                            row[2] or "Unknown",  
-                            date_display          
-                        )
-                        student_tree.insert("", tk.END, values=formatted_values)
-                    except Exception as e:
-                        print(f"Error processing row {row}: {str(e)}")
+            print(f"Generating report for student: {student_var.get()}")
+            self.worker.submit(self.db_ops.get_student_grade_ranks_by_id, student_id,
+                               on_success=show_student_report,
+                               on_error=show_student_report_error,
+                               key='student-report')
+        
+        def show_student_report_error(e):
+            print(f"Error generating student report: {str(e)}")
+            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+        
+        def show_student_report(performance_data):
+            if not performance_data:
+                messagebox.showinfo("Info", "No performance data available for this student")
+                return
+            
+            print(f"Retrieved {len(performance_data)} grade records")
+            
+            for row in performance_data:
+                try:
+                    grade_value = row[1]
+                    if grade_value is not None:
+                        try:
+                            grade_display = f"{float(grade_value):.1f}%"
+                        except (ValueError, TypeError):
+                            grade_display = str(grade_value)
+                    else:
+                        grade_display = "N/A"
+                    
+                    date_value = row[3]
+                    if date_value:
+                        try:
+                            date_display = date_value.strftime('%Y-%m-%d')
+                        except AttributeError:
+                            date_display = str(date_value)
+                    else:
+                        date_display = ""
+                    
+                    rank_display = f"{row[4]} of {row[5]}" if row[4] else ""
                         
-                print("Student report generated successfully")
-            except Exception as e:
-                print(f"Error generating student report: {str(e)}")
-                messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+                    formatted_values = (
+                        row[0] or "Unknown", 
+                        grade_display,       
+                        row[2] or "Unknown",  
+                        date_display,
+                        rank_display
+                    )
+                    student_tree.insert("", tk.END, values=formatted_values)
+                except Exception as e:
+                    print(f"Error processing row {row}: {str(e)}")
+                    
+            print("Student report generated successfully")
+        
+        def refresh():
+            for combo in (class_combo, teacher_combo, student_combo):
+                combo.reload()
+        
+        refresh()
+        return refresh
 
     def run(self):
+        # Idle callbacks run once the first batch of window drawing has been processed
+        self.root.after_idle(lambda: self.startup.mark('first paint'))
         self.root.mainloop()
         
     def show_graphs(self):
-        self.clear_main_content()
+        self.screens.show('graphs', self.build_graphs_screen,
+                          ('Grades', 'Enrollments', 'Students', 'Classes', 'Subjects'),
+                          on_leave=self.leave_graphs_screen)
+
+    def leave_graphs_screen(self):
+        # Each chart holds a Tk canvas and its raster, so they are freed while other screens are in use;
+        # invalidating the screen makes the next visit redraw into the same tabs
+        self.worker.cancel('dashboard')
+        self.figures.release()
+        self.screens.invalidate('graphs')
+
+    def build_graphs_screen(self, frame):
+        if self.figures is None:
+            from figure_manager import FigureManager
+            self.figures = FigureManager()
         
-        header_frame = ttk.Frame(self.content_frame)
+        header_frame = ttk.Frame(frame)
         header_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         
         ttk.Label(header_frame, text="Data Visualization & Insights", font=('Helvetica', 16, 'bold')).pack(side=tk.LEFT, padx=5)
         
-        notebook = ttk.Notebook(self.content_frame)
+        notebook = ttk.Notebook(frame)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         class_performance_frame = ttk.Frame(notebook, padding="10")
@@ -1673,15 +1864,149 @@ class SchoolManagementGUI:
         grade_distribution_frame = ttk.Frame(notebook, padding="10")
         notebook.add(grade_distribution_frame, text="Grade Distribution")
         
-        self._create_class_performance_graph(class_performance_frame)
-        self._create_subject_performance_graph(subject_performance_frame)
-        self._create_gender_distribution_graph(gender_distribution_frame)
-        self._create_enrollment_distribution_graph(enrollment_frame)
-        self._create_grade_distribution_graph(grade_distribution_frame)
+        grade_trends_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(grade_trends_frame, text="Grade Trends")
+        
+        graphs = [
+            (class_performance_frame, self._create_class_performance_graph),
+            (subject_performance_frame, self._create_subject_performance_graph),
+            (gender_distribution_frame, self._create_gender_distribution_graph),
+            (enrollment_frame, self._create_enrollment_distribution_graph),
+            (grade_distribution_frame, self._create_grade_distribution_graph),
+            (grade_trends_frame, self._create_grade_trends_graph),
+        ]
+        loading_labels = []
+        
+        def show_error(message):
+            print(f"Error loading graph data: {message}")
+            for loading_label in loading_labels:
+                loading_label.config(text=f"Error creating graph: {message}", foreground='red')
+        
+        loaded = {}
+        rendered = set()
+        
+        def render_selected_graph(*args):
+            snapshot = loaded.get('snapshot')
+            if snapshot is None:
+                return
+            index = notebook.index(notebook.select())
+            if index in rendered:
+                return
+            rendered.add(index)
+            loading_labels[index].destroy()
+            chart_frame, create_graph = graphs[index]
+            create_graph(chart_frame, snapshot)
+        
+        def show_snapshot(snapshot):
+            if snapshot is None:
+                show_error("dashboard data is unavailable")
+                return
+            loaded['snapshot'] = snapshot
+            render_selected_graph()
+        
+        def load():
+            loaded.clear()
+            rendered.clear()
+            loading_labels.clear()
+            for chart_frame, _ in graphs:
+                for child in chart_frame.winfo_children():
+                    child.destroy()
+                loading_label = ttk.Label(chart_frame, text="Loading...", font=('Helvetica', 12))
+                loading_label.pack(pady=20)
+                loading_labels.append(loading_label)
+            self.worker.submit(self.db_ops.get_dashboard_snapshot, on_success=show_snapshot,
+                               on_error=lambda e: show_error(str(e)), key='dashboard')
+        
+        notebook.bind('<<NotebookTabChanged>>', render_selected_graph)
+        load()
+        return load
+    
+    def _show_chart(self, parent_frame, kind, data, size):
+        chart_label = ttk.Label(parent_frame, anchor="center")
+        chart_label.pack(fill=tk.BOTH, expand=True)
+        
+        def show_png(png):
+            image = tk.PhotoImage(data=png_to_photo_data(png))
+            chart_label.config(image=image, text="")
+            chart_label.image = image
+        
+        def show_error(e):
+            print(f"Error rendering {kind} chart: {str(e)}")
+            chart_label.config(text=f"Error creating graph: {str(e)}", foreground='red')
+        
+        png = self.charts.load_cached(kind, data, size)
+        if png:
+            show_png(png)
+            return
+        
+        chart_label.config(text="Rendering chart...")
+        self.worker.track(self.charts.render(kind, data, size), on_success=show_png, on_error=show_error,
+                          key=f"chart-{kind}")
+    
+    def _create_grade_trends_graph(self, parent_frame, snapshot):
+        windows = {
+            "Last 4 weeks": 28,
+            "Last 3 months": 91,
+            "Last 6 months": 182,
+            "Last 12 months": 365,
+        }
+        
+        controls_frame = ttk.LabelFrame(parent_frame, text="Filters", padding="10")
+        controls_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
+        
+        ttk.Label(controls_frame, text="Period:").pack(side=tk.LEFT, padx=5)
+        period_var = tk.StringVar(value='month')
+        ttk.Combobox(controls_frame, textvariable=period_var, values=self.db_ops.TREND_PERIODS,
+                     state='readonly', width=10).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(controls_frame, text="Group by:").pack(side=tk.LEFT, padx=5)
+        group_var = tk.StringVar(value='class')
+        ttk.Combobox(controls_frame, textvariable=group_var, values=('class', 'subject'),
+                     state='readonly', width=10).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(controls_frame, text="Window:").pack(side=tk.LEFT, padx=5)
+        window_var = tk.StringVar(value="Last 6 months")
+        ttk.Combobox(controls_frame, textvariable=window_var, values=list(windows),
+                     state='readonly', width=15).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(controls_frame, text="Show Trends", command=lambda: load_trends(),
+                   style='Action.TButton').pack(side=tk.LEFT, padx=10)
+        
+        chart_frame = ttk.Frame(parent_frame)
+        chart_frame.pack(fill=tk.BOTH, expand=True)
+        
+        def show_message(text, **options):
+            for widget in chart_frame.winfo_children():
+                widget.destroy()
+            ttk.Label(chart_frame, text=text, font=('Helvetica', 12), **options).pack(pady=20)
+        
+        def load_trends():
+            start = datetime.datetime.now() - datetime.timedelta(days=windows[window_var.get()])
+            show_message("Loading...")
+            self.worker.submit(self.db_ops.get_grade_trends, period_var.get(), group_var.get(), start,
+                               on_success=show_trends,
+                               on_error=lambda e: show_message(f"Error creating graph: {str(e)}", foreground='red'),
+                               key='grade-trends')
+        
+        def show_trends(rows):
+            if not rows:
+                show_message("No grades were recorded in this window")
+                return
+            
+            series = {}
+            for period, label, avg_grade, _ in rows:
+                series.setdefault(label, []).append([period.isoformat(), round(avg_grade, 2)])
+            
+            for widget in chart_frame.winfo_children():
+                widget.destroy()
+            self._show_chart(chart_frame, 'grade_trends', [[label, points] for label, points in series.items()],
+                             (1000, 550))
+        
+        load_trends()
     
-    def _create_class_performance_graph(self, parent_frame):
+    def _create_class_performance_graph(self, parent_frame, snapshot):
         try:
-            data = self.db_ops.get_class_average_grades()
+            data = snapshot.class_averages
             if not data:
                 ttk.Label(parent_frame, text="No class performance data available", font=('Helvetica', 12)).pack(pady=20)
                 return
@@ -1689,23 +2014,8 @@ class SchoolManagementGUI:
             class_names = [row[0] for row in data]
             avg_grades = [float(row[1]) for row in data]
             
-            fig, ax = plt.subplots(figsize=(10, 6))
-            bars = ax.bar(class_names, avg_grades, color='skyblue')
-            
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                        f'{height:.1f}%', ha='center', va='bottom')
-            
-            ax.set_title('Average Grade by Class', fontsize=14)
-            ax.set_xlabel('Class', fontsize=12)
-            ax.set_ylabel('Average Grade (%)', fontsize=12)
-            ax.set_ylim(0, 100)  
-            ax.grid(True, axis='y', linestyle='--', alpha=0.7)
-            
-            canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._show_chart(parent_frame, 'class_performance',
+                             [[name, grade] for name, grade in zip(class_names, avg_grades)], (1000, 600))
             
             insights_frame = ttk.LabelFrame(parent_frame, text="Insights", padding=10)
             insights_frame.pack(fill=tk.X, padx=5, pady=10)
@@ -1729,9 +2039,9 @@ class SchoolManagementGUI:
             print(f"Error creating class performance graph: {str(e)}")
             ttk.Label(parent_frame, text=f"Error creating graph: {str(e)}", foreground='red').pack(pady=20)
     
-    def _create_subject_performance_graph(self, parent_frame):
+    def _create_subject_performance_graph(self, parent_frame, snapshot):
         try:
-            data = self.db_ops.get_subject_average_grades()
+            data = snapshot.subject_averages
             if not data:
                 ttk.Label(parent_frame, text="No subject performance data available", font=('Helvetica', 12)).pack(pady=20)
                 return
@@ -1739,23 +2049,30 @@ class SchoolManagementGUI:
             subject_names = [row[0] for row in data]
             avg_grades = [float(row[1]) for row in data]
             
-            fig, ax = plt.subplots(figsize=(10, 6))
-            bars = ax.barh(subject_names, avg_grades, color='lightgreen')
-            
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + 0.5, bar.get_y() + bar.get_height()/2,
-                        f'{width:.1f}%', ha='left', va='center')
-            
-            ax.set_title('Average Grade by Subject', fontsize=14)
-            ax.set_xlabel('Average Grade (%)', fontsize=12)
-            ax.set_ylabel('Subject', fontsize=12)
-            ax.set_xlim(0, 100)  
-            ax.grid(True, axis='x', linestyle='--', alpha=0.7)
+            _, artists = self.figures.figure('subject_performance', figsize=(10, 6))
+            if artists.get('categories') == subject_names:
+                for bar, label, width in zip(artists['bars'], artists['labels'], avg_grades):
+                    bar.set_width(width)
+                    label.set_x(width + 0.5)
+                    label.set_text(f'{width:.1f}%')
+            else:
+                ax, artists = self.figures.reset('subject_performance')
+                bars = ax.barh(subject_names, avg_grades, color='lightgreen')
+                
+                labels = []
+                for bar in bars:
+                    width = bar.get_width()
+                    labels.append(ax.text(width + 0.5, bar.get_y() + bar.get_height()/2,
+                                          f'{width:.1f}%', ha='left', va='center'))
+                
+                ax.set_title('Average Grade by Subject', fontsize=14)
+                ax.set_xlabel('Average Grade (%)', fontsize=12)
+                ax.set_ylabel('Subject', fontsize=12)
+                ax.set_xlim(0, 100)  
+                ax.grid(True, axis='x', linestyle='--', alpha=0.7)
+                artists.update(categories=subject_names, bars=bars, labels=labels)
             
-            canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.figures.show('subject_performance', parent_frame, fill=tk.BOTH, expand=True)
             
             insights_frame = ttk.LabelFrame(parent_frame, text="Insights", padding=10)
             insights_frame.pack(fill=tk.X, padx=5, pady=10)
@@ -1781,9 +2098,9 @@ class SchoolManagementGUI:
             print(f"Error creating subject performance graph: {str(e)}")
             ttk.Label(parent_frame, text=f"Error creating graph: {str(e)}", foreground='red').pack(pady=20)
 
-    def _create_gender_distribution_graph(self, parent_frame):
+    def _create_gender_distribution_graph(self, parent_frame, snapshot):
         try:
-            data = self.db_ops.get_gender_distribution()
+            data = snapshot.gender_distribution
             if not data:
                 ttk.Label(parent_frame, text="No gender distribution data available", font=('Helvetica', 12)).pack(pady=20)
                 return
@@ -1792,7 +2109,8 @@ class SchoolManagementGUI:
             counts = [int(row[1]) for row in data]
             total = sum(counts)
             
-            fig, ax = plt.subplots(figsize=(8, 6))
+            self.figures.figure('gender_distribution', figsize=(8, 6))
+            ax, _ = self.figures.reset('gender_distribution')
             
             gender_mapping = {'M': 'Male', 'F': 'Female'}
             labels = [gender_mapping.get(g, g) for g in genders]
@@ -1807,15 +2125,15 @@ class SchoolManagementGUI:
                 shadow=True
             )
             
-            plt.setp(autotexts, size=10, weight='bold')
-            plt.setp(texts, size=12)
+            for autotext in autotexts:
+                autotext.set(size=10, weight='bold')
+            for text in texts:
+                text.set(size=12)
             
             ax.set_title('Student Gender Distribution', fontsize=14)
             ax.axis('equal')  
             
-            canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.figures.show('gender_distribution', parent_frame, fill=tk.BOTH, expand=True)
             
             insights_frame = ttk.LabelFrame(parent_frame, text="Demographics Insights", padding=10)
             insights_frame.pack(fill=tk.X, padx=5, pady=10)
@@ -1840,9 +2158,9 @@ class SchoolManagementGUI:
             print(f"Error creating gender distribution graph: {str(e)}")
             ttk.Label(parent_frame, text=f"Error creating graph: {str(e)}", foreground='red').pack(pady=20)
 
-    def _create_enrollment_distribution_graph(self, parent_frame):
+    def _create_enrollment_distribution_graph(self, parent_frame, snapshot):
         try:
-            data = self.db_ops.get_class_enrollment_counts()
+            data = snapshot.enrollment_counts
             if not data:
                 ttk.Label(parent_frame, text="No enrollment distribution data available", font=('Helvetica', 12)).pack(pady=20)
                 return
@@ -1850,23 +2168,31 @@ class SchoolManagementGUI:
             class_names = [row[0] for row in data]
             enrollment_counts = [row[1] for row in data]
             
-            fig, ax = plt.subplots(figsize=(10, 6))
-            bars = ax.bar(class_names, enrollment_counts, color='lightcoral')
-            
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                        f'{height}', ha='center', va='bottom')
-            
-            ax.set_title('Student Enrollment Distribution by Class', fontsize=14)
-            ax.set_xlabel('Class', fontsize=12)
-            ax.set_ylabel('Number of Students', fontsize=12)
-            ax.set_ylim(0, max(enrollment_counts) + 5) 
-            ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+            _, artists = self.figures.figure('enrollment_distribution', figsize=(10, 6))
+            if artists.get('categories') == class_names:
+                for bar, label, height in zip(artists['bars'], artists['labels'], enrollment_counts):
+                    bar.set_height(height)
+                    label.set_y(height + 0.5)
+                    label.set_text(f'{height}')
+                artists['axes'].set_ylim(0, max(enrollment_counts) + 5)
+            else:
+                ax, artists = self.figures.reset('enrollment_distribution')
+                bars = ax.bar(class_names, enrollment_counts, color='lightcoral')
+                
+                labels = []
+                for bar in bars:
+                    height = bar.get_height()
+                    labels.append(ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                                          f'{height}', ha='center', va='bottom'))
+                
+                ax.set_title('Student Enrollment Distribution by Class', fontsize=14)
+                ax.set_xlabel('Class', fontsize=12)
+                ax.set_ylabel('Number of Students', fontsize=12)
+                ax.set_ylim(0, max(enrollment_counts) + 5) 
+                ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+                artists.update(categories=class_names, bars=bars, labels=labels, axes=ax)
             
-            canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self.figures.show('enrollment_distribution', parent_frame, fill=tk.BOTH, expand=True)
             
             insights_frame = ttk.LabelFrame(parent_frame, text="Insights", padding=10)
             insights_frame.pack(fill=tk.X, padx=5, pady=10)
@@ -1889,14 +2215,14 @@ class SchoolManagementGUI:
             print(f"Error creating enrollment distribution graph: {str(e)}")
             ttk.Label(parent_frame, text=f"Error creating graph: {str(e)}", foreground='red').pack(pady=20)
 
-    def _create_grade_distribution_graph(self, parent_frame):
+    def _create_grade_distribution_graph(self, parent_frame, snapshot):
         try:
             print("Creating grade distribution graph...")
             
             graph_frame = ttk.Frame(parent_frame)
             graph_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
-            grade_distribution = self.db_ops.get_grade_distribution()
+            grade_distribution = snapshot.grade_distribution
             print(f"Grade distribution data received: {grade_distribution}")
             
             if not grade_distribution or len(grade_distribution) == 0:
@@ -1909,35 +2235,8 @@ class SchoolManagementGUI:
             print(f"Labels: {labels}")
             print(f"Values: {values}")
             
-            colors = ['#4CAF50', '#8BC34A', '#FFC107', '#FF9800', '#F44336']
-            
-            fig, ax = plt.subplots(figsize=(8, 6))
-            fig.patch.set_facecolor('#F0F0F0')
-            
-            wedges, texts, autotexts = ax.pie(
-                values, 
-                labels=None, 
-                autopct='%1.1f%%',
-                startangle=90,
-                colors=colors,
-                wedgeprops={'edgecolor': 'white', 'linewidth': 1},
-                textprops={'fontsize': 12, 'color': 'white'}
-            )
-            
-            ax.axis('equal')
-            ax.set_title('Grade Distribution', fontsize=16, pad=20)
-            
-            ax.legend(
-                wedges, 
-                labels,
-                title="Grade Ranges",
-                loc="center left",
-                bbox_to_anchor=(1, 0, 0.5, 1)
-            )
-            
-            canvas = FigureCanvasTkAgg(fig, graph_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._show_chart(graph_frame, 'grade_distribution',
+                             [[label, value] for label, value in zip(labels, values)], (800, 600))
             
             insights_frame = ttk.Frame(parent_frame)
             insights_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -0,0 +1,181 @@
+from bisect import bisect_left
+
+def _longest_increasing_run(positions):
+    # Indexes into positions forming a longest strictly increasing subsequence (patience sorting)
+    tails = []
+    tail_indexes = []
+    previous = [-1] * len(positions)
+    for index, position in enumerate(positions):
+        slot = bisect_left(tails, position)
+        if slot == len(tails):
+            tails.append(position)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = position
+            tail_indexes[slot] = index
+        previous[index] = tail_indexes[slot - 1] if slot else -1
+
+    run = []
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        run.append(index)
+        index = previous[index]
+    return set(run)
+
+class KeyedTableModel:
+    def __init__(self, tree, key=None, formatter=None, preserve_scroll=True, loader=None):
+        self.tree = tree
+        self.key = key or (lambda row: row[0])
+        self.formatter = formatter or tuple
+        self.preserve_scroll = preserve_scroll
+        self.loader = loader
+
+        self._order = []
+        self._values = {}
+        self._running = None
+        self._generation = 0
+
+        self.last_refresh = None
+        self._totals = {
+            'refreshes': 0,
+            'inserted': 0,
+            'updated': 0,
+            'deleted': 0,
+            'moved': 0,
+            'unchanged': 0,
+            'tk_calls': 0,
+            'naive_tk_calls': 0,
+        }
+
+    def __len__(self):
+        return len(self._order)
+
+    def set_rows(self, rows):
+        items = [(self.key(row), row) for row in rows]
+        if self.loader is not None:
+            return self.loader.start(self, self.apply_steps(items, self.formatter), len(items))
+        return self.apply(items, self.formatter)
+
+    def apply(self, items, formatter=tuple):
+        for _ in self.apply_steps(items, formatter):
+            pass
+        return self.last_refresh
+
+    def apply_steps(self, items, formatter=tuple):
+        # Closing an unfinished refresh leaves the model describing whatever it had already placed
+        if self._running is not None:
+            self._running.close()
+        self._generation += 1
+        self._running = self._steps(self._generation, items, formatter)
+        return self._running
+
+    def _steps(self, generation, items, formatter):
+        tree = self.tree
+        new_order = []
+        rows = {}
+        for key, row in items:
+            iid = str(key)
+            if iid in rows:
+                # Keep duplicate keys displayable without letting them collide with each other
+                suffix = 1
+                while f"{iid}#{suffix}" in rows:
+                    suffix += 1
+                iid = f"{iid}#{suffix}"
+            new_order.append(iid)
+            rows[iid] = row
+
+        scroll = tree.yview()[0] if self.preserve_scroll and self._order else None
+        selection = tree.selection()
+        focus = tree.focus()
+        tk_calls = 0
+
+        unknown = [iid for iid in tree.get_children() if iid not in self._values]
+        deleted = [iid for iid in self._order if iid not in rows]
+        if unknown or deleted:
+            tree.delete(*(unknown + deleted))
+            tk_calls += 1
+        for iid in deleted:
+            del self._values[iid]
+
+        old_positions = {iid: position for position, iid in enumerate(self._order) if iid in rows}
+        kept = [iid for iid in new_order if iid in old_positions]
+        stable_indexes = _longest_increasing_run([old_positions[iid] for iid in kept])
+        stable = {kept[index] for index in stable_indexes}
+
+        moving = [iid for iid in kept if iid not in stable]
+        if moving:
+            tree.detach(*moving)
+            tk_calls += 1
+
+        placed = inserted = updated = unchanged = 0
+        try:
+            for index, iid in enumerate(new_order):
+                values = tuple(formatter(rows[iid]))
+                if iid not in old_positions:
+                    tree.insert("", index, iid=iid, values=values)
+                    inserted += 1
+                    tk_calls += 1
+                else:
+                    if iid not in stable:
+                        # Every row before index is already in its final place, so index is exact
+                        tree.move(iid, "", index)
+                        tk_calls += 1
+                    if self._values[iid] != values:
+                        tree.item(iid, values=values)
+                        updated += 1
+                        tk_calls += 1
+                    elif iid in stable:
+                        unchanged += 1
+                self._values[iid] = values
+                placed = index + 1
+                yield placed
+        finally:
+            if placed < len(new_order):
+                # Rows still detached were never put back, so drop them rather than leak hidden items
+                orphans = [iid for iid in new_order[placed:] if iid in old_positions and iid not in stable]
+                if orphans:
+                    tree.delete(*orphans)
+                    tk_calls += 1
+                for iid in orphans:
+                    del self._values[iid]
+                self._order = new_order[:placed] + [iid for iid in new_order[placed:] if iid in stable]
+            else:
+                self._order = new_order
+            if self._generation == generation:
+                self._running = None
+
+            kept_selection = tuple(iid for iid in selection if iid in self._values)
+            if kept_selection != tuple(tree.selection()):
+                tree.selection_set(kept_selection)
+                tk_calls += 1
+            if focus and focus in self._values:
+                tree.focus(focus)
+            if scroll is not None:
+                tree.yview_moveto(scroll)
+
+            # What deleting every displayed row and reinserting the new result costs
+            naive_tk_calls = len(unknown) + len(old_positions) + len(deleted) + placed
+            self.last_refresh = {
+                'rows': len(self._order),
+                'complete': placed == len(new_order),
+                'inserted': inserted,
+                'updated': updated,
+                'deleted': len(deleted) + len(unknown),
+                'moved': len(moving),
+                'unchanged': unchanged,
+                'tk_calls': tk_calls,
+                'naive_tk_calls': naive_tk_calls,
+                'saved_tk_calls': naive_tk_calls - tk_calls,
+            }
+            totals = self._totals
+            totals['refreshes'] += 1
+            for name in ('inserted', 'updated', 'deleted', 'moved', 'unchanged', 'tk_calls', 'naive_tk_calls'):
+                totals[name] += self.last_refresh[name]
+
+    def clear(self):
+        return self.apply([])
+
+    def stats(self):
+        stats = dict(self._totals)
+        stats['saved_tk_calls'] = stats['naive_tk_calls'] - stats['tk_calls']
+        return stats
@@ -0,0 +1,86 @@
+import tkinter as tk
+from tkinter import ttk
+
+class Screen:
+    def __init__(self, name, build, dependencies, on_leave=None):
+        self.name = name
+        self.build = build
+        self.dependencies = tuple(dependencies)
+        self.on_leave = on_leave
+        self.frame = None
+        self.refresh = None
+        self.versions = None
+
+class ScreenManager:
+    def __init__(self, container, versions):
+        self.container = container
+        self.versions = versions
+        self.current = None
+        self._screens = {}
+
+        self._built = 0
+        self._reused = 0
+        self._refreshed = 0
+
+    def show(self, name, build, dependencies=(), on_leave=None):
+        screen = self._screens.get(name)
+        if screen is None:
+            screen = Screen(name, build, dependencies, on_leave)
+            self._screens[name] = screen
+
+        if self.current is not None and self.current is not screen and self.current.frame is not None:
+            self.current.frame.pack_forget()
+            if self.current.on_leave is not None:
+                self.current.on_leave()
+        self.current = screen
+
+        if screen.frame is None:
+            self._build(screen)
+        else:
+            versions = self.versions(screen.dependencies)
+            if versions == screen.versions:
+                self._reused += 1
+            elif screen.refresh is not None:
+                # Record the versions first so writes made while the refresh loads are caught next time
+                screen.versions = versions
+                self._refreshed += 1
+                screen.refresh()
+            else:
+                self._destroy(screen)
+                self._build(screen)
+
+        screen.frame.pack(fill=tk.BOTH, expand=True)
+        return screen.frame
+
+    def invalidate(self, name=None):
+        names = [name] if name is not None else list(self._screens)
+        for screen_name in names:
+            screen = self._screens.get(screen_name)
+            if screen is not None:
+                screen.versions = None
+
+    def destroy(self):
+        for screen in self._screens.values():
+            self._destroy(screen)
+        self._screens.clear()
+        self.current = None
+
+    def stats(self):
+        return {
+            'screens': len(self._screens),
+            'built': self._built,
+            'reused': self._reused,
+            'refreshed': self._refreshed,
+        }
+
+    def _build(self, screen):
+        screen.frame = ttk.Frame(self.container)
+        screen.versions = self.versions(screen.dependencies)
+        self._built += 1
+        screen.refresh = screen.build(screen.frame)
+
+    def _destroy(self, screen):
+        if screen.frame is not None:
+            screen.frame.destroy()
+        screen.frame = None
+        screen.refresh = None
@@ -0,0 +1,43 @@
+import threading
+import time
+
+STARTUP_PHASES = ('imports', 'window', 'first paint', 'connect', 'first query')
+
+class StartupTimer:
+    def __init__(self, started=None, phases=STARTUP_PHASES):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = phases
+        self.marks = {}
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def mark(self, name):
+        with self._lock:
+            if name in self.marks:
+                return
+            self.marks[name] = time.perf_counter() - self.started
+            complete = not self._reported and all(phase in self.marks for phase in self.phases)
+            if complete:
+                self._reported = True
+        if complete:
+            self.report()
+
+    def timed(self, name, fn):
+        def run(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            self.mark(name)
+            return result
+        return run
+
+    def report(self):
+        # Marks can arrive from worker threads, so the report lists them in the order they happened
+        lines = ["Startup timing:"]
+        previous = 0.0
+        for name, elapsed in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  {name:<12} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        missing = [phase for phase in self.phases if phase not in self.marks]
+        if missing:
+            lines.append(f"  not reached: {', '.join(missing)}")
+        print("\n".join(lines))
+        return dict(self.marks)
@@ -0,0 +1,141 @@
+from bisect import bisect_left
+from collections import Counter
+from tkinter import ttk
+
+# Keys that move around the entry or the dropdown without changing what was typed
+NAVIGATION_KEYS = {
+    'Up', 'Down', 'Left', 'Right', 'Home', 'End', 'Prior', 'Next', 'Return', 'KP_Enter', 'Escape', 'Tab',
+    'Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R',
+}
+
+def id_labels(rows):
+    counts = Counter(row[1] for row in rows)
+    # Names are not unique, so repeated ones get their ID appended to keep each label distinct
+    return {(row[1] if counts[row[1]] == 1 else f"{row[1]} (#{row[0]})"): row[0] for row in rows}
+
+class PrefixIndex:
+    def __init__(self, rows):
+        entries = sorted(((str(row[1] or '').casefold(), row[0], row[1]) for row in rows), key=lambda entry: entry[:2])
+        self._keys = [entry[0] for entry in entries]
+        self._rows = [(entry[1], entry[2]) for entry in entries]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def search(self, prefix, limit):
+        prefix = prefix.strip().casefold()
+        start = bisect_left(self._keys, prefix)
+        end = min(start + limit, len(self._keys))
+        matches = []
+        for index in range(start, end):
+            if not self._keys[index].startswith(prefix):
+                break
+            matches.append(self._rows[index])
+        return matches
+
+class TypeaheadCombobox(ttk.Combobox):
+    def __init__(self, parent, source, worker=None, limit=20, delay=150, extra_values=(), **kwargs):
+        super().__init__(parent, postcommand=self._before_post, **kwargs)
+        self.source = source
+        self.worker = worker
+        self.limit = limit
+        self.delay = delay
+        self.extra_values = list(extra_values)
+
+        self._ids = {}
+        self._selected = None
+        self._loaded_prefix = None
+        self._job = None
+        self._request_key = ('typeahead', str(self))
+
+        self.bind('<KeyRelease>', self._on_key, add='+')
+        self.bind('<<ComboboxSelected>>', self._on_selected, add='+')
+        self.bind('<Destroy>', self._on_destroy, add='+')
+        self['values'] = self.extra_values
+
+    @property
+    def selected_id(self):
+        text = self.get()
+        if self._selected is not None and self._selected[0] == text:
+            return self._selected[1]
+        return self._ids.get(text)
+
+    def select(self, item_id, label):
+        self.set(label)
+        self._selected = (label, item_id)
+
+    def set_source(self, source):
+        self.source = source
+        self._selected = None
+        self._loaded_prefix = None
+        self.set('')
+        self.reload()
+
+    def reload(self):
+        self._cancel()
+        prefix = self.get()
+        if prefix in self.extra_values:
+            # A placeholder such as 'None' is not a name prefix, so it lists everything
+            prefix = ''
+        if self.worker is None:
+            self._show(prefix, self.source(prefix, self.limit))
+            return
+        self.worker.submit(self.source, prefix, self.limit,
+                           on_success=lambda rows: self._show(prefix, rows),
+                           on_error=lambda error: print(f"Error looking up '{prefix}': {str(error)}"),
+                           key=self._request_key)
+
+    def _on_key(self, event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(self.delay, self._run_job)
+
+    def _run_job(self):
+        self._job = None
+        self.reload()
+
+    def _before_post(self):
+        # Opening the list right after typing should not show matches for an older prefix, so those are
+        # cleared here and the open list is refilled once the lookup for the current text returns
+        text = self.get()
+        if self._loaded_prefix is not None and \
+           (text == self._loaded_prefix or text in self._ids or text in self.extra_values):
+            return
+        self._ids = {}
+        self._loaded_prefix = None
+        self['values'] = self.extra_values
+        self.reload()
+
+    def _on_selected(self, event):
+        label = self.get()
+        if label in self._ids:
+            self._selected = (label, self._ids[label])
+
+    def _show(self, prefix, rows):
+        if not self.winfo_exists():
+            return
+        self._ids = id_labels(rows or [])
+        self._loaded_prefix = prefix
+        self['values'] = self.extra_values + list(self._ids)
+        self._refresh_popdown()
+
+    def _refresh_popdown(self):
+        # ttk copies -values into the dropdown only when it opens, so an open one is refilled and resized here
+        popdown = f"{self}.popdown"
+        if self.tk.call('winfo', 'exists', popdown) and self.tk.call('winfo', 'ismapped', popdown):
+            self.tk.call('ttk::combobox::ConfigureListbox', self)
+            self.update_idletasks()
+            self.tk.call('ttk::combobox::PlacePopdown', self, popdown)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        if self.worker is not None:
+            self.worker.cancel(self._request_key)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._cancel()
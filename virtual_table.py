@@ -0,0 +1,246 @@
+from tkinter import ttk
+from collections import OrderedDict
+
+from keyed_table import KeyedTableModel
+
+class VirtualTable:
+    def __init__(self, parent, columns, formatter=None, key=None, page_size=200, margin=5, max_cached_pages=20,
+                 worker=None):
+        self.parent = parent
+        self.columns = columns
+        self.formatter = formatter or tuple
+        self.key = key or (lambda row: row[0])
+        self.page_size = page_size
+        self.margin = margin
+        self.max_cached_pages = max_cached_pages
+        self.worker = worker
+        self.placeholder = ("Loading...",) + ("",) * (len(columns) - 1)
+        self.error_placeholder = ("Failed to load",) + ("",) * (len(columns) - 1)
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse")
+        # Scrolling is virtual, so the model never has to restore the Treeview's own scroll offset
+        self.model = KeyedTableModel(self.tree, preserve_scroll=False)
+        self.y_scroll = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.x_scroll = ttk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.x_scroll.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.y_scroll.grid(row=0, column=1, sticky="ns")
+        self.x_scroll.grid(row=1, column=0, sticky="ew")
+        parent.grid_rowconfigure(0, weight=1)
+        parent.grid_columnconfigure(0, weight=1)
+
+        self._count = lambda: 0
+        self._fetch = lambda offset, limit: []
+        self._total = 0
+        self._first = 0
+        self._visible = 20
+        self._pages = OrderedDict()
+        self._failed = set()
+        self._background = False
+        self._selected_key = None
+        self._generation = 0
+        self._requests = {}
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-self._total))
+        self.tree.bind("<End>", lambda e: self._move_selection(self._total))
+
+    @property
+    def total(self):
+        return self._total
+
+    def set_source(self, count, fetch, background=True):
+        self._count = count
+        self._fetch = fetch
+        self._background = background and self.worker is not None
+        self._first = 0
+        self.refresh()
+
+    def set_rows(self, rows):
+        rows = list(rows)
+        self.set_source(lambda: len(rows), lambda offset, limit: rows[offset:offset + limit], background=False)
+
+    def refresh(self):
+        self._generation += 1
+        for future in self._requests.values():
+            future.cancel()
+        self._requests.clear()
+        # Pages that failed earlier are fetched again on the next refresh
+        self._failed.clear()
+
+        if not self._background:
+            self._load_count(self._generation, self._count() or 0)
+            return
+
+        generation = self._generation
+        self._requests['count'] = self.worker.submit(
+            self._count,
+            on_success=lambda total: self._load_count(generation, total or 0),
+            on_error=lambda error: self._load_failed(generation, 'count', error)
+        )
+
+    def _load_count(self, generation, total):
+        if generation != self._generation:
+            return
+        self._requests.pop('count', None)
+        self._pages.clear()
+        self._total = total
+        self._render()
+
+    def _load_page(self, generation, page_index, rows):
+        if generation != self._generation:
+            return
+        self._requests.pop(page_index, None)
+        self._store_page(page_index, rows or [])
+        self._render()
+
+    def _load_failed(self, generation, request, error):
+        if generation != self._generation:
+            return
+        print(f"Error loading table data: {str(error)}")
+        self._requests.pop(request, None)
+        if request != 'count':
+            self._failed.add(request)
+            self._render()
+
+    def _request_page(self, page_index):
+        if page_index in self._requests:
+            return
+        generation = self._generation
+        self._requests[page_index] = self.worker.submit(
+            self._fetch,
+            page_index * self.page_size,
+            self.page_size,
+            on_success=lambda rows: self._load_page(generation, page_index, rows),
+            on_error=lambda error: self._load_failed(generation, page_index, error)
+        )
+
+    def _store_page(self, page_index, rows):
+        self._pages[page_index] = rows
+        while len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+
+    def scroll_to(self, index):
+        index = max(0, min(index, self._total - self._visible))
+        if index != self._first:
+            self._first = index
+            self._render()
+
+    def _page(self, page_index):
+        rows = self._pages.get(page_index)
+        if rows is not None:
+            self._pages.move_to_end(page_index)
+        elif page_index in self._failed:
+            # Left alone until the next refresh so a failing query is not retried on every render
+            return None
+        elif not self._background:
+            rows = self._fetch(page_index * self.page_size, self.page_size) or []
+            self._store_page(page_index, rows)
+        else:
+            self._request_page(page_index)
+        return rows
+
+    def _rows(self, start, count):
+        end = min(start + count, self._total)
+        rows = []
+        for page_index in range(start // self.page_size, (end - 1) // self.page_size + 1 if end > start else 0):
+            page_start = page_index * self.page_size
+            page_end = min(page_start + self.page_size, end)
+            page = self._page(page_index)
+            if page is None:
+                rows.extend([None] * (page_end - max(start, page_start)))
+            else:
+                rows.extend(page[max(start - page_start, 0):end - page_start])
+        return rows
+
+    def _render(self):
+        self._first = max(0, min(self._first, self._total - self._visible))
+
+        shown = set(self.tree.get_children())
+        selection = self.tree.selection()
+        if selection:
+            self._selected_key = selection[0]
+        elif self._selected_key in shown:
+            self._selected_key = None
+
+        items = []
+        for index, row in enumerate(self._rows(self._first, self._visible + self.margin), self._first):
+            if row is None:
+                failed = index // self.page_size in self._failed
+                items.append((f"loading-{index}", self.error_placeholder if failed else self.placeholder))
+            else:
+                items.append((self.key(row), self.formatter(row)))
+        self.model.apply(items)
+
+        if self._selected_key and self.tree.exists(self._selected_key) and self._selected_key not in self.tree.selection():
+            self.tree.selection_set(self._selected_key)
+            self.tree.focus(self._selected_key)
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self._total <= 0:
+            self.y_scroll.set(0.0, 1.0)
+            return
+        start = self._first / self._total
+        end = min(1.0, (self._first + self._visible) / self._total)
+        self.y_scroll.set(start, end)
+
+    def _measure_visible(self):
+        height = self.tree.winfo_height()
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                return max(1, (height - bbox[1]) // max(bbox[3], 1))
+        return max(1, (height - 25) // 20)
+
+    def _on_configure(self, event):
+        visible = self._measure_visible()
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * self._total))
+        elif action == 'scroll':
+            step = self._visible if args[1] == 'pages' else 1
+            self._scroll_by(int(args[0]) * step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_by(self, amount):
+        self.scroll_to(self._first + amount)
+        return "break"
+
+    def _move_selection(self, step):
+        children = self.tree.get_children()
+        if not children:
+            return "break"
+        selection = self.tree.selection()
+        current = self._first + children.index(selection[0]) if selection and selection[0] in children else self._first - 1
+        target = max(0, min(current + step, self._total - 1))
+
+        if target < self._first:
+            self.scroll_to(target)
+        elif target >= self._first + self._visible:
+            self.scroll_to(target - self._visible + 1)
+
+        children = self.tree.get_children()
+        index = target - self._first
+        if 0 <= index < len(children):
+            self.tree.selection_set(children[index])
+            self.tree.focus(children[index])
+            self._selected_key = children[index]
+        return "break"